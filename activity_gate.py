@@ -0,0 +1,84 @@
+import numpy as np
+from whitening import whitening_matrix
+
+GATE_DECISIONS = ("refit", "reapply", "skip")
+
+
+class ActivityGate:
+    """
+    Etapa barata antes do ICA que decide o que fazer com cada janela:
+
+    - "skip": a janela está abaixo de min_signal_threshold (pico) e não é processada;
+    - "reapply": a covariância da entrada, vista pelo branqueamento do último ajuste,
+      continua próxima da identidade (a mistura não mudou) e a matriz de separação em
+      cache é reaplicada com uma única multiplicação;
+    - "refit": caso contrário, ou após gate_max_reapply reaplicações seguidas.
+
+    A deriva é ||K C K^T - I||_F / sqrt(n), com C a covariância da janela normalizada e
+    K o branqueamento (n_components x canais) calculado na janela do último ajuste.
+    Custa O(amostras * canais^2), bem menos que uma iteração do FastICA.
+    """
+
+    def __init__(self, config, stats=None):
+        """
+        :param config: Configuração do sistema de áudio (min_signal_threshold, gate_*).
+        :param stats: PipelineStats opcional que recebe os contadores de cada decisão.
+        """
+        self.n_components = config.n_components
+        self.threshold = config.min_signal_threshold
+        self.drift_threshold = config.gate_drift_threshold
+        self.max_reapply = config.gate_max_reapply
+        self.stats = stats
+        self.counts = dict.fromkeys(GATE_DECISIONS, 0)
+        self.drift = 0.0  # Deriva da última janela avaliada
+        self._whitening = None  # (n_components, canais) da janela do último ajuste
+        self._reapplied = 0
+
+    def idle(self, peaks):
+        """
+        Janelas brutas abaixo do limiar de sinal (contam como "skip").
+
+        :param peaks: Pico absoluto de cada janela, array (janelas,).
+        :return: Máscara booleana das janelas ociosas.
+        """
+        idle = peaks < self.threshold
+        skipped = int(np.count_nonzero(idle))
+        if skipped:
+            self._count("skip", skipped)
+        return idle
+
+    def decide(self, data):
+        """
+        Decide entre reajustar e reaplicar a separação para uma janela normalizada.
+
+        :param data: Janela normalizada (frames, canais).
+        :return: "refit" ou "reapply".
+        """
+        if self._whitening is None or self._reapplied >= self.max_reapply:
+            return "refit"
+
+        covariance = data.T @ data / len(data)
+        whitened = self._whitening @ covariance @ self._whitening.T
+        self.drift = float(np.linalg.norm(whitened - np.eye(self.n_components))
+                           / np.sqrt(self.n_components))
+        return "reapply" if self.drift < self.drift_threshold else "refit"
+
+    def record(self, decision, data):
+        """Registra a decisão efetivamente tomada; um ajuste renova a referência"""
+        self._count(decision)
+        if decision == "reapply":
+            self._reapplied += 1
+            return
+
+        self._reapplied = 0
+        self._whitening = whitening_matrix(data.T @ data / len(data), self.n_components)
+
+    def shares(self):
+        """Fração das janelas em cada decisão"""
+        total = sum(self.counts.values())
+        return {decision: count / total if total else 0.0 for decision, count in self.counts.items()}
+
+    def _count(self, decision, amount=1):
+        self.counts[decision] += amount
+        if self.stats is not None:
+            self.stats.increment(f"gate_{decision}", amount)
@@ -6,10 +6,50 @@ from dataclasses import dataclass
 @dataclass
 class AudioConfig:
     window_size: int = 2048
+    hop_size: int = None  # Deslocamento entre janelas de análise (< window_size: sobreposição; None: window_size)
+    max_batch_windows: int = 8  # Janelas prontas normalizadas juntas em um lote
+    result_pool_size: int = 32  # Janelas em rodízio nos buffers de resultado (validade de cada resultado)
     sample_rate: int = 44100
-    n_components: int = 2
+    channels: int = 2  # Canais capturados do dispositivo
+    n_components: int = 2  # Componentes separados (<= channels)
     buffer_size: int = 4410
     update_interval: int = 50
     min_signal_threshold: float = 0.01
-    queue_size: int = 100
+    activity_gating: bool = True  # Pula janelas em silêncio e reaplica a separação se a mistura não mudou
+    gate_drift_threshold: float = 0.1  # Deriva máxima da covariância branqueada para reaplicar
+    gate_max_reapply: int = 50  # Reaplicações seguidas antes de forçar um novo ajuste
+    queue_size: int = 100  # Capacidade do buffer circular, em blocos de buffer_size
+    scheduler_policy: str = "all"  # "all" (todos em ordem), "latest" (só o mais recente) ou "deadline"
+    target_latency_ms: float = 250.0  # Latência alvo da política "deadline"
+    scheduler_trend_seconds: float = 5.0  # Janela de tempo da tendência do acúmulo
     monitoring_interval: float = 1.0  # Intervalo de monitoramento em segundos
+    ica_max_iter: int = 200  # Iterações máximas do FastICA
+    ica_tol: float = 0.01  # Tolerância de convergência do FastICA
+    ica_engine: str = "fastica"  # "fastica" (sklearn), "numpy" (FastICA float32) ou "stft" (frequência)
+    ica_whitening_interval: int = 1  # Janelas entre recálculos do branqueamento no motor "numpy"
+    stft_fft_size: int = 128  # Tamanho da FFT do motor "stft"
+    stft_hop_size: int = 64  # Deslocamento entre quadros da STFT
+    stft_max_iter: int = 20  # Iterações máximas do FastICA complexo por janela
+    stft_context_seconds: float = 0.5  # Áudio recente acumulado para as estatísticas por bin
+    ica_mode: str = "batch"  # "batch" (ajuste completo a cada janela) ou "incremental"
+    ica_refit_interval: int = 20  # Janelas entre ajustes completos no modo incremental
+    ica_learning_rate: float = 0.01  # Passo do gradiente natural entre ajustes completos
+    recording_dir: str = "recordings"  # Diretório das gravações em blocos .npy
+    recording_chunk_seconds: float = 60.0  # Áudio por arquivo antes da rotação
+    recording_rotate_interval: float = 300.0  # Rotação por tempo de relógio, em segundos
+    device_cache_path: str = ".cache/audio_device.json"  # Último dispositivo verificado; "" desliga o cache
+    capture_path: str = ""  # Arquivo .icacap com os blocos brutos do callback; "" desliga
+    replay_path: str = ""  # Reproduz uma captura no lugar do dispositivo de áudio
+    replay_speed: float = 1.0  # Ritmo da reprodução: 1 = tempo real, N = N vezes mais rápido, 0 = sem limite
+    replay_backpressure: bool = False  # Reprodução espera espaço no buffer circular em vez de descartar
+    display_history_seconds: float = 2.0  # Histórico rolante exibido nos gráficos
+    display_max_points: int = 4096  # Limite de bins da decimação mín-máx por curva
+    stats_dump_interval: float = 0.0  # Intervalo (s) do log periódico das estatísticas; 0 desliga
+    stats_dump_path: str = ""  # Arquivo JSON-lines opcional para o log periódico
+    profile_processing: str = ""  # Profiler da etapa de processamento: "", "cprofile" ou "sampling"
+    profile_output: str = "processing.prof"  # Arquivo de saída do profiler
+    log_level: str = "DEBUG"
+    log_file: str = "log/ica_debug.log"
+    log_rate_limit_interval: float = 5.0  # Uma mensagem por ponto de log a cada N segundos; 0 desliga
+    log_rate_limit_level: str = "INFO"  # Nível máximo limitado; WARNING e acima sempre passam
+    metrics_log_path: str = "log/metrics.jsonl"  # Métricas por janela em JSON-lines; "" desliga
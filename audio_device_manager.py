@@ -1,7 +1,9 @@
-import sounddevice as sd
+import json
 import logging
-import numpy as np
 import time
+from pathlib import Path
+
+import numpy as np
 
 
 class AudioDeviceManager:
@@ -9,33 +11,89 @@ class AudioDeviceManager:
         self.config = config
         self.device_info = None
         self.device_idx = None
-        self.buffer = np.zeros((self.config.window_size, 2))
+        self.buffer = np.zeros((self.config.window_size, self.config.channels), dtype=np.float32)
 
     def setup_device(self):
-        """Configura o dispositivo de áudio"""
+        """
+        Configura o dispositivo de áudio.
+
+        A última seleção verificada fica em config.device_cache_path; se o dispositivo em cache
+        ainda existe com o mesmo nome e aceita os canais e a taxa de amostragem, a varredura de
+        todos os dispositivos e o stream de teste são dispensados.
+        """
+        import sounddevice as sd
+
+        if not self._load_cached_device(sd):
+            self._select_device(sd)
+            if not self._verify_audio_input(sd):
+                raise RuntimeError("Falha ao verificar entrada de áudio")
+            self._save_cached_device()
+        sd.default.device = self.device_idx
+
+    def _select_device(self, sd):
+        """Procura o BlackHole com canais de entrada suficientes entre todos os dispositivos"""
         devices = sd.query_devices()
         logging.info(f"Dispositivos disponíveis:\n{devices}")
 
         for i, device in enumerate(devices):
-            if 'BlackHole' in device['name']:
+            if 'BlackHole' in device['name'] and device['max_input_channels'] >= self.config.channels:
                 self.device_idx = i
                 self.device_info = device
                 logging.info(f"BlackHole encontrado no índice {i}")
                 break
 
         if self.device_idx is None:
-            raise RuntimeError("BlackHole não encontrado")
+            raise RuntimeError(f"BlackHole com {self.config.channels} canais de entrada não encontrado")
 
-        sd.default.device = self.device_idx
-        if not self._verify_audio_input():
-            raise RuntimeError("Falha ao verificar entrada de áudio")
+    def _load_cached_device(self, sd):
+        """Revalida o dispositivo em cache: só a consulta de um índice e das configurações de entrada"""
+        if not self.config.device_cache_path:
+            return False
+        path = Path(self.config.device_cache_path)
+        if not path.exists():
+            return False
+
+        try:
+            with open(path) as f:
+                cached = json.load(f)
+            if cached["channels"] != self.config.channels or cached["sample_rate"] != self.config.sample_rate:
+                return False
+            device = sd.query_devices(cached["index"])
+            if device['name'] != cached["name"] or device['max_input_channels'] < self.config.channels:
+                logging.info("Dispositivo em cache mudou; refazendo a seleção")
+                return False
+            sd.check_input_settings(device=cached["index"], channels=self.config.channels,
+                                    samplerate=self.config.sample_rate)
+        except Exception as e:
+            logging.info(f"Cache do dispositivo de áudio inválido ({e}); refazendo a seleção")
+            return False
+
+        self.device_idx = cached["index"]
+        self.device_info = device
+        logging.info(f"Dispositivo em cache revalidado: {device['name']} (índice {self.device_idx})")
+        return True
+
+    def _save_cached_device(self):
+        if not self.config.device_cache_path:
+            return
+        path = Path(self.config.device_cache_path)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump({"index": self.device_idx,
+                           "name": self.device_info['name'],
+                           "channels": self.config.channels,
+                           "sample_rate": self.config.sample_rate,
+                           "verified_at": time.time()}, f, indent=2)
+        except OSError as e:
+            logging.warning(f"Não foi possível gravar o cache do dispositivo em {path}: {e}")
 
-    def _verify_audio_input(self):
+    def _verify_audio_input(self, sd):
         """Verifica entrada de áudio de forma robusta"""
         try:
             with sd.InputStream(
                     device=self.device_idx,
-                    channels=2,
+                    channels=self.config.channels,
                     blocksize=self.config.buffer_size,
                     samplerate=self.config.sample_rate
             ) as test_stream:
@@ -1,114 +1,141 @@
 import logging
-import queue
-import numpy as np
-import sounddevice as sd
-from PyQt5.QtCore import QTimer, QDateTime
-from signal_analysis import SignalAnalysis
+import time
+from capture_replay import CaptureWriter, ReplayStream
+from display_buffer import DisplayHistory
+from log_setup import MetricsSink
+from pipeline_stats import PipelineStats
+from processing_worker import ProcessingWorker
+from ring_buffer import RingBuffer
+from signal_pipeline import SignalPipeline
+from stream_recorder import StreamRecorder
 
 
 class AudioProcessor:
-    def __init__(self, config, device_manager, signal_processor, visualizer):
+    def __init__(self, config, device_manager, signal_processor, visualizer, start_time=None):
+        """
+        :param visualizer: Destino de update_plot; pode ser atribuído depois, antes do loop de atualização.
+        :param start_time: Início do programa (time.perf_counter), referência do tempo até a
+                           primeira janela separada (padrão: criação do processador).
+        """
         self.config = config
         self.device_manager = device_manager
         self.signal_processor = signal_processor
         self.visualizer = visualizer
-        self.audio_queue = queue.Queue(maxsize=self.config.queue_size)
+        self.ring_buffer = RingBuffer(self.config.queue_size * self.config.buffer_size, self.config.channels)
         self.frame_count = 0
         self.running = True
         self.stream = None
-        self.all_mixed_data = []
-        self.all_separated_data = []
+        self.recorder = StreamRecorder(self.config)
+        self.display = DisplayHistory(self.config)
+        self.capture = (CaptureWriter(self.config.capture_path, self.config.sample_rate, self.config.channels)
+                        if self.config.capture_path else None)
+        self.stats = PipelineStats()
+        self.metrics_sink = MetricsSink(self.config.metrics_log_path) if self.config.metrics_log_path else None
+        self.pipeline = SignalPipeline(self.config, self.signal_processor, self.stats, self.metrics_sink)
+        self.worker = ProcessingWorker(self.config, self.ring_buffer, self.pipeline,
+                                       on_result=self._store_result)
+        self.last_rendered_sequence = 0
+        self.start_time = start_time if start_time is not None else time.perf_counter()
+        self.time_to_first_window = None
 
     def start(self):
         """Inicia o processamento de áudio"""
         try:
-            logging.info("Configurando o dispositivo de áudio...")
-            self.device_manager.setup_device()
-            logging.info("Dispositivo configurado. Iniciando stream de áudio.")
-
-            # Inicia o stream de áudio
-            self.stream = sd.InputStream(
-                device=sd.default.device[0],
-                channels=2,
-                callback=self.audio_callback,
-                samplerate=self.config.sample_rate,
-                blocksize=self.config.buffer_size
-            )
+            if self.config.replay_path:
+                # Captura reproduzida pelo mesmo callback, sem dispositivo
+                wait_for_space = self.ring_buffer.free if self.config.replay_backpressure else None
+                self.stream = ReplayStream(self.config.replay_path, self.audio_callback,
+                                           self.config.replay_speed, wait_for_space)
+                logging.info(f"Reproduzindo {self.config.replay_path} "
+                             f"(velocidade {self.config.replay_speed or 'sem limite'}).")
+            else:
+                import sounddevice as sd
+
+                logging.info("Configurando o dispositivo de áudio...")
+                setup_start = time.perf_counter()
+                self.device_manager.setup_device()
+                self.stats.set_gauge("startup_device_s", time.perf_counter() - setup_start)
+                logging.info("Dispositivo configurado. Iniciando stream de áudio.")
+
+                # Inicia o stream de áudio
+                self.stream = sd.InputStream(
+                    device=sd.default.device[0],
+                    channels=self.config.channels,
+                    callback=self.audio_callback,
+                    samplerate=self.config.sample_rate,
+                    blocksize=self.config.buffer_size
+                )
             self.stream.start()
+            self.stats.set_gauge("startup_stream_s", time.perf_counter() - self.start_time)
             logging.info("Stream de áudio iniciado com sucesso.")
 
+            # ICA e métricas rodam fora da thread da interface
+            self.worker.start()
+            self.stats.start_periodic_dump(self.config.stats_dump_interval, self.config.stats_dump_path)
+
         except Exception as e:
             logging.error(f"Erro durante a execução do processador de áudio: {e}", exc_info=True)
             self._cleanup()
 
     def start_update_loop(self):
         """Inicia o loop de atualização de gráficos via QTimer (na thread principal)"""
+        from PyQt5.QtCore import QTimer
+
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_plot)
         self.timer.start(50)  # Atualiza a cada 50ms (20 FPS)
         logging.info("Loop de atualização de gráficos iniciado com QTimer na thread principal.")
 
     def audio_callback(self, indata, frames, time_info, status):
-        """Callback do stream de áudio"""
+        """Callback do stream de áudio (apenas copia o bloco para o buffer circular)"""
+        if self.capture is not None and indata is not None:
+            self.capture.write(indata, status, time_info)
         if status:
-            logging.warning(f"Status do áudio: {status}")
-        if indata is not None and np.any(indata):
-            signal_level = np.max(np.abs(indata))
-            logging.info(f"Sinal capturado com nível: {signal_level:.6f}")
-
-            if signal_level > 0:
-                if not self.audio_queue.full():
-                    self.audio_queue.put_nowait(indata.copy())
-                    self.frame_count += 1
-                    if self.frame_count % 100 == 0:
-                        logging.debug(f"Processados {self.frame_count} frames")
-                else:
-                    logging.warning("Fila de áudio está cheia")
+            # Por bloco: em INFO passa pelo limite de taxa do log; o total fica no contador
+            self.stats.increment("audio_status_flags")
+            logging.info("Status do áudio: %s", status)
+        if indata is not None and self.ring_buffer.write(indata):
+            self.frame_count += 1
 
     def update_plot(self):
-        """Atualiza a visualização dos sinais"""
+        """Renderiza o resultado mais recente publicado pelo worker de processamento"""
         try:
-            if not self.audio_queue.empty():
-                data = self.audio_queue.get_nowait()
-
-                if data is not None:
-                    logging.info("Dados capturados, processando...")
-                    data = data[:self.config.window_size]
-
-                    # Normalizar os dados
-                    data = np.nan_to_num(data)
-                    data = (data - np.mean(data, axis=0)) / np.std(data, axis=0)
-
-                    # Aplicar o ICA
-                    separated_data = self.signal_processor.process(data)
-
-                    if separated_data is not None:
-                        # Calcular métricas de análise entre sinais
-                        distances = {
-                            "Euclidean": SignalAnalysis.euclidean_distance(separated_data[:, 0], separated_data[:, 1]),
-                            "Cross Correlation": SignalAnalysis.cross_correlation(separated_data[:, 0],
-                                                                                  separated_data[:, 1]),
-                            "Pearson": SignalAnalysis.pearson_distance(separated_data[:, 0], separated_data[:, 1]),
-                            "MSE": SignalAnalysis.mean_squared_error(separated_data[:, 0], separated_data[:, 1]),
-                            "Cosine": SignalAnalysis.cosine_distance(separated_data[:, 0], separated_data[:, 1]),
-                            "Cross Entropy": SignalAnalysis.cross_entropy(separated_data[:, 0], separated_data[:, 1])
-                        }
-
-                        logging.info(f"Distâncias entre sinais separados: {distances}")
-
-                        # Atualizar o gráfico com os dados processados e métricas
-                        self.visualizer.update_plot(data, separated_data, distances)
-
-                        # Armazenar os dados misturados e separados
-                        self.all_mixed_data.append(data)
-                        self.all_separated_data.append(separated_data)
-                    else:
-                        logging.warning("Nenhum dado separado foi retornado.")
-            else:
-                logging.warning("Fila de dados de áudio está vazia!")
+            result = self.worker.latest_result()
+            if result is None or result.sequence == self.last_rendered_sequence:
+                return
+
+            # Resultados publicados pelo worker que a interface não chegou a exibir
+            skipped = result.sequence - self.last_rendered_sequence - 1
+            if skipped > 0:
+                self.stats.increment("windows_not_rendered", skipped)
+            self.last_rendered_sequence = result.sequence
+
+            with self.stats.time_stage("render"):
+                self.visualizer.update_plot(result.metrics)
+            if result.capture_time is not None:
+                self.stats.record_latency("end_to_end", time.perf_counter() - result.capture_time)
+            self.stats.increment("windows_rendered")
         except Exception as e:
             logging.error(f"Erro na atualização do gráfico: {e}", exc_info=True)
 
+    def stats_snapshot(self):
+        """Snapshot das estatísticas do pipeline, incluindo buffer circular, escalonador e gate"""
+        snapshot = self.stats.snapshot()
+        snapshot["ring_buffer"] = self.ring_buffer.stats()
+        snapshot["scheduler"] = self.worker.scheduler.summary()
+        if self.pipeline.gate is not None:
+            snapshot["gate_shares"] = self.pipeline.gate.shares()
+        return snapshot
+
+    def _store_result(self, result):
+        """Alimenta os históricos exibidos e grava os dados em disco (chamado na thread do worker)"""
+        if self.time_to_first_window is None:
+            self.time_to_first_window = time.perf_counter() - self.start_time
+            self.stats.set_gauge("time_to_first_window_s", self.time_to_first_window)
+            logging.info(f"Primeira janela separada {self.time_to_first_window * 1000:.0f} ms após o início")
+        self.display.record(result)
+        self.recorder.record(result)
+
     def stop_stream(self):
         """Para o stream de áudio de forma segura"""
         try:
@@ -125,15 +152,23 @@ class AudioProcessor:
         self.running = False
         logging.info("Limpando recursos e salvando dados...")
 
-        # Parar o stream de áudio
+        # Parar o stream de áudio e o worker de processamento
         self.stop_stream()
+        self.worker.stop(timeout=2.0)
+        self.stats.stop_periodic_dump()
+        if self.capture is not None:
+            self.capture.close()
+            self.capture = None
+        if self.metrics_sink is not None:
+            self.metrics_sink.close()
+        logging.info(f"Estatísticas finais do pipeline: {self.stats_snapshot()}")
 
         # Parar o timer de atualização (se estiver rodando)
         if hasattr(self, 'timer'):
             self.timer.stop()
 
         # Verificar e salvar os dados misturados e separados
-        if self.all_mixed_data and self.all_separated_data:
+        if self.recorder.has_data:
             logging.info("Salvando resultados do processamento...")
             self.save_results()
         else:
@@ -142,18 +177,9 @@ class AudioProcessor:
         logging.info("Sistema finalizado com sucesso.")
 
     def save_results(self):
-        """Salva os dados de áudio misturados e separados"""
+        """Fecha a gravação em blocos dos dados de áudio misturados e separados"""
         try:
-            timestamp = QDateTime.currentDateTime().toString("yyyyMMdd_HHmmss")
-            filename = self.visualizer.graphs_dir / f"ica_recording_{timestamp}.png"
-
-            # Processar e concatenar os dados
-            mixed_data = np.array(self.all_mixed_data).reshape(-1, 2)
-            separated_data = np.array(self.all_separated_data).reshape(-1, 2)
-
-            # Plotar e salvar os gráficos
-            self.visualizer.save_graphs(mixed_data, separated_data, filename)
-
-            logging.info(f"Resultados salvos em: {filename}")
+            manifest_path = self.recorder.close()
+            logging.info(f"Resultados salvos em: {manifest_path}")
         except Exception as e:
             logging.error(f"Erro ao salvar resultados: {e}", exc_info=True)
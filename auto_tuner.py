@@ -0,0 +1,283 @@
+"""
+Ajuste automático de window_size, ica_tol, ica_max_iter e do motor de ICA.
+
+Cada tentativa reproduz misturas sintéticas (com as fontes conhecidas, qualidade = SIR)
+ou gravações (sem referência, qualidade = independência das energias dos sinais
+separados) pelo SignalPipeline completo e mede a latência por janela. As tentativas,
+em grade ou sorteadas, são distribuídas entre processos.
+
+A latência considerada é a de ponta a ponta de uma janela: a duração da própria janela
+(tempo para preenchê-la) mais o p95 do processamento. O relatório traz a fronteira de
+Pareto latência x qualidade e a AudioConfig recomendada para o orçamento de latência.
+
+Como as tentativas rodam em paralelo, as latências medidas incluem a disputa por cache
+e memória entre processos; use --workers 1 para medições isoladas.
+
+Uso:
+    python auto_tuner.py --budget-ms 100
+    python auto_tuner.py gravacao.wav --search random --trials 40 --budget-ms 80
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, replace
+
+import numpy as np
+
+from audio_config import AudioConfig
+from ica_engines import ENGINES
+
+# Estado de cada processo de tentativa, carregado uma vez pelo inicializador
+_BASE_CONFIG = None
+_MIXTURES = []  # (misturas, fontes ou None, filter_length)
+
+
+def independence_db(separated):
+    """
+    Qualidade sem referência: -10 log10 da correlação média, em módulo, entre as energias
+    instantâneas dos sinais separados (fontes independentes têm energias descorrelacionadas).
+    """
+    energy = separated.astype(np.float64) ** 2
+    correlation = np.corrcoef(energy.T)
+    pairs = np.triu_indices(correlation.shape[0], 1)
+    dependence = np.nanmean(np.abs(correlation[pairs]))
+    return float(-10 * np.log10(max(dependence, 1e-6)))
+
+
+def load_sources(config, paths=(), seconds=5.0, convolutive=False, seed=0):
+    """
+    Misturas usadas nas tentativas.
+
+    :param paths: Gravações WAV/NPY; sem gravações, gera uma mistura sintética.
+    :param seconds: Duração máxima usada de cada mistura.
+    :param convolutive: Mistura sintética convolutiva (qualidade por SIR com atrasos).
+    :return: Lista de (misturas float32, fontes ou None, filter_length).
+    """
+    from benchmark import convolutive_mixture, synthetic_mixture
+    from batch_separate import open_recording
+
+    n_samples = int(seconds * config.sample_rate)
+    if not paths:
+        if convolutive:
+            filter_length = 16
+            sources, _, mixtures = convolutive_mixture(config.n_components, n_samples, config.channels,
+                                                       filter_length, config.sample_rate, seed)
+        else:
+            filter_length = 1
+            sources, _, mixtures = synthetic_mixture(config.n_components, n_samples, config.channels,
+                                                     config.sample_rate, seed)
+        return [(mixtures, sources, filter_length)]
+
+    loaded = []
+    for path in paths:
+        reader = open_recording(path, config.sample_rate)
+        try:
+            if reader.channels != config.channels or reader.sample_rate != config.sample_rate:
+                raise ValueError(f"{path}: {reader.channels} canais a {reader.sample_rate} Hz, "
+                                 f"esperado {config.channels} a {config.sample_rate} Hz")
+            loaded.append((reader.read(min(n_samples, reader.n_frames)), None, 1))
+        finally:
+            reader.close()
+    return loaded
+
+
+def _init_worker(base_config, paths, seconds, convolutive, seed):
+    """Carrega as misturas uma vez por processo; BLAS com uma thread (o paralelismo é por tentativa)"""
+    global _BASE_CONFIG, _MIXTURES
+    from signal_processor import limit_blas_threads
+
+    logging.basicConfig(level=logging.WARNING, force=True,
+                        format='%(asctime)s - %(levelname)s - [%(processName)s] %(message)s')
+    limit_blas_threads(1)
+    _BASE_CONFIG = base_config
+    _MIXTURES = load_sources(base_config, paths, seconds, convolutive, seed)
+
+
+def run_trial(params):
+    """
+    Executa uma combinação de parâmetros sobre todas as misturas do processo.
+
+    :return: Parâmetros, latências (ms) e qualidade média (dB).
+    """
+    from benchmark import separation_quality
+    from signal_pipeline import SignalPipeline
+    from signal_processor import SignalProcessor
+
+    # Janelas sem sobreposição e sem o gate: mede o custo do ICA em toda janela
+    config = replace(_BASE_CONFIG, **params, hop_size=None, activity_gating=False, metrics_log_path="")
+    processor = SignalProcessor(config)
+    processor.prepare()  # A importação do motor (~1 s no sklearn) fica fora da medição
+    pipeline = SignalPipeline(config, processor)
+    window_size = config.window_size
+
+    latencies, qualities = [], []
+    for mixtures, sources, filter_length in _MIXTURES:
+        for start in range(0, len(mixtures) - window_size + 1, window_size):
+            window = slice(start, start + window_size)
+            start_time = time.perf_counter()
+            data = pipeline.normalize(mixtures[window])
+            result = pipeline.process(data) if data is not None else None
+            if result is None:
+                continue
+            latencies.append(time.perf_counter() - start_time)
+            if sources is not None:
+                qualities.append(separation_quality(result.separated, sources[window], filter_length)[1])
+            else:
+                qualities.append(independence_db(result.separated))
+
+    if not latencies:
+        return {"params": params, "windows": 0}
+    latencies = np.asarray(latencies) * 1000
+    processing_p95 = float(np.percentile(latencies, 95))
+    return {
+        "params": params,
+        "windows": len(latencies),
+        "processing_ms": {"p50": float(np.percentile(latencies, 50)), "p95": processing_p95},
+        "window_ms": 1000 * window_size / config.sample_rate,
+        "latency_ms": 1000 * window_size / config.sample_rate + processing_p95,
+        "realtime_load": float(np.mean(latencies)) / (1000 * window_size / config.sample_rate),
+        "quality_db": float(np.mean(qualities)),
+    }
+
+
+def grid_trials(space):
+    """Todas as combinações do espaço de busca"""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def random_trials(space, n_trials, seed=0):
+    """
+    Combinações sorteadas: valores discretos por sorteio simples e ica_tol log-uniforme
+    entre o menor e o maior valor informado.
+    """
+    rng = np.random.default_rng(seed)
+    trials = []
+    for _ in range(n_trials):
+        params = {name: values[rng.integers(len(values))] for name, values in space.items()}
+        tols = space.get("ica_tol", ())
+        if len(tols) > 1:
+            low, high = np.log10(min(tols)), np.log10(max(tols))
+            params["ica_tol"] = float(10 ** rng.uniform(low, high))
+        for name, value in params.items():
+            if isinstance(value, np.generic):
+                params[name] = value.item()
+        trials.append(params)
+    return trials
+
+
+def pareto_front(results):
+    """Tentativas não dominadas: nenhuma outra tem latência menor ou igual e qualidade maior"""
+    front = []
+    best_quality = -np.inf
+    for result in sorted(results, key=lambda result: (result["latency_ms"], -result["quality_db"])):
+        if result["quality_db"] > best_quality:
+            front.append(result)
+            best_quality = result["quality_db"]
+    return front
+
+
+def recommend(results, budget_ms):
+    """Melhor qualidade dentro do orçamento de latência (desempate pela menor latência)"""
+    within_budget = [result for result in results if result["latency_ms"] <= budget_ms]
+    if not within_budget:
+        return None
+    return max(within_budget, key=lambda result: (result["quality_db"], -result["latency_ms"]))
+
+
+def run_tuning(base_config, trials, paths=(), seconds=5.0, convolutive=False, workers=None, seed=0):
+    """Distribui as tentativas entre processos e retorna os resultados válidos"""
+    workers = workers or os.cpu_count()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(base_config, tuple(paths), seconds, convolutive, seed)) as executor:
+        futures = {executor.submit(run_trial, params): params for params in trials}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                logging.error(f"Erro na tentativa {futures[future]}: {e}", exc_info=True)
+                continue
+            if result["windows"] == 0:
+                logging.warning(f"Tentativa sem janelas processadas: {result['params']}")
+                continue
+            results.append(result)
+            logging.info(f"{result['params']}: latência {result['latency_ms']:.1f} ms, "
+                         f"qualidade {result['quality_db']:.1f} dB")
+    return results
+
+
+def parse_args(argv=None):
+    defaults = AudioConfig()
+    parser = argparse.ArgumentParser(description="Ajuste automático de parâmetros do ICA")
+    parser.add_argument('inputs', nargs='*',
+                        help="Gravações WAV/NPY (frames, canais); sem entradas usa misturas sintéticas")
+    parser.add_argument('--convolutive', action='store_true', help="Mistura sintética convolutiva")
+    parser.add_argument('--seconds', type=float, default=5.0, help="Áudio usado por mistura")
+    parser.add_argument('--sample-rate', type=int, default=defaults.sample_rate)
+    parser.add_argument('--channels', type=int, default=defaults.channels)
+    parser.add_argument('--n-components', type=int, default=defaults.n_components)
+    parser.add_argument('--window-sizes', type=int, nargs='+', default=[512, 1024, 2048, 4096, 8192])
+    parser.add_argument('--tols', type=float, nargs='+', default=[1e-4, 1e-3, 1e-2, 1e-1])
+    parser.add_argument('--max-iters', type=int, nargs='+', default=[50, 100, 200, 400])
+    parser.add_argument('--engines', nargs='+', choices=sorted(ENGINES), default=['fastica', 'numpy'])
+    parser.add_argument('--ica-modes', nargs='+', choices=['batch', 'incremental'], default=['batch'])
+    parser.add_argument('--search', choices=['grid', 'random'], default='grid')
+    parser.add_argument('--trials', type=int, default=30, help="Tentativas da busca aleatória")
+    parser.add_argument('--budget-ms', type=float, default=100.0, help="Orçamento de latência de ponta a ponta")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Número de processos (padrão: número de núcleos)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', default='tuning_results.json')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    base_config = AudioConfig(sample_rate=args.sample_rate, channels=args.channels,
+                              n_components=args.n_components)
+    space = {"window_size": args.window_sizes, "ica_tol": args.tols, "ica_max_iter": args.max_iters,
+             "ica_engine": args.engines, "ica_mode": args.ica_modes}
+    trials = grid_trials(space) if args.search == 'grid' else random_trials(space, args.trials, args.seed)
+    logging.info(f"{len(trials)} tentativas ({args.search})")
+
+    start_time = time.perf_counter()
+    results = run_tuning(base_config, trials, args.inputs, args.seconds, args.convolutive, args.workers, args.seed)
+    elapsed = time.perf_counter() - start_time
+
+    front = pareto_front(results)
+    best = recommend(results, args.budget_ms)
+    report = {
+        "search": args.search,
+        "budget_ms": args.budget_ms,
+        "elapsed": elapsed,
+        "trials": results,
+        "pareto": front,
+        "recommended": None,
+    }
+    for result in front:
+        logging.info(f"Pareto: latência {result['latency_ms']:.1f} ms, qualidade {result['quality_db']:.1f} dB, "
+                     f"{result['params']}")
+    if best is None:
+        logging.warning(f"Nenhuma tentativa dentro do orçamento de {args.budget_ms:.0f} ms")
+    else:
+        config = replace(base_config, **best["params"], hop_size=None)
+        report["recommended"] = {**best, "config": asdict(config)}
+        logging.info(f"Recomendado para {args.budget_ms:.0f} ms: latência {best['latency_ms']:.1f} ms, "
+                     f"qualidade {best['quality_db']:.1f} dB, {best['params']}")
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    logging.info(f"{len(results)} tentativas em {elapsed:.1f} s; relatório gravado em {args.output}")
+    return 0 if best is not None else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,275 @@
+"""
+Separação em lote, sem interface gráfica nem dispositivo de áudio.
+
+Cada gravação (WAV PCM ou .npy com shape (frames, canais)) é lida janela a janela, passa
+pelo SignalPipeline (normalização, ICA e métricas) e gera as faixas separadas e um CSV com
+as métricas de cada janela. Os arquivos são distribuídos entre processos.
+
+O ActivityGate fica desligado por padrão: em lote, toda janela passa pelo ICA completo e
+só janelas em silêncio absoluto (ou falhas do ICA) são gravadas como zeros. Com --gating,
+janelas abaixo de min_signal_threshold também viram zeros e matrizes em cache podem ser
+reaplicadas; o resumo de cada arquivo informa quantas janelas foram zeradas.
+
+Uso:
+    python batch_separate.py gravacao1.wav gravacao2.npy -o resultados --workers 4
+"""
+import argparse
+import csv
+import logging
+import os
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+from activity_gate import GATE_DECISIONS
+from audio_config import AudioConfig
+from ica_engines import ENGINES
+from signal_pipeline import SignalPipeline
+from signal_processor import SignalProcessor, limit_blas_threads
+
+WAV_OUTPUT_SCALE = 0.25  # Componentes separados têm variância unitária: ±4 desvios cabem em ±1
+
+
+class WavReader:
+    """Leitura incremental de WAV PCM (8, 16, 24 ou 32 bits)"""
+
+    def __init__(self, path):
+        self._wav = wave.open(str(path), 'rb')
+        self.channels = self._wav.getnchannels()
+        self.sample_rate = self._wav.getframerate()
+        self.n_frames = self._wav.getnframes()
+        self._sample_width = self._wav.getsampwidth()
+
+    def read(self, n_frames):
+        raw = self._wav.readframes(n_frames)
+        width = self._sample_width
+        if width == 1:
+            data = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+        elif width == 3:
+            # Estende cada amostra de 24 bits para 32 bits antes de converter
+            samples = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+            padded = np.zeros((len(samples), 4), dtype=np.uint8)
+            padded[:, 1:] = samples
+            data = padded.view('<i4').ravel().astype(np.float32) / 2 ** 31
+        else:
+            dtype = {2: '<i2', 4: '<i4'}[width]
+            data = np.frombuffer(raw, dtype=dtype).astype(np.float32) / 2 ** (8 * width - 1)
+        return data.reshape(-1, self.channels)
+
+    def close(self):
+        self._wav.close()
+
+
+class NpyReader:
+    """Leitura incremental de .npy (frames, canais) via memory map"""
+
+    def __init__(self, path, sample_rate):
+        self._data = np.load(path, mmap_mode='r')
+        if self._data.ndim != 2:
+            raise ValueError(f"{path}: esperado array (frames, canais), obtido {self._data.shape}")
+        self.channels = self._data.shape[1]
+        self.sample_rate = sample_rate
+        self.n_frames = self._data.shape[0]
+        self._position = 0
+
+    def read(self, n_frames):
+        start = self._position
+        self._position = min(start + n_frames, self.n_frames)
+        return np.asarray(self._data[start:self._position], dtype=np.float32)
+
+    def close(self):
+        self._data = None
+
+
+def open_recording(path, sample_rate):
+    """Abre uma gravação conforme a extensão do arquivo"""
+    if Path(path).suffix.lower() == '.npy':
+        return NpyReader(path, sample_rate)
+    return WavReader(path)
+
+
+class SeparatedWriter:
+    """Grava as faixas separadas em WAV de 16 bits ou em .npy float32 pré-alocado"""
+
+    def __init__(self, path, n_frames, channels, sample_rate, output_format):
+        self.output_format = output_format
+        self._position = 0
+        if output_format == 'npy':
+            self.path = path.with_suffix('.npy')
+            self._array = np.lib.format.open_memmap(self.path, mode='w+', dtype=np.float32,
+                                                    shape=(n_frames, channels))
+        else:
+            self.path = path.with_suffix('.wav')
+            self._wav = wave.open(str(self.path), 'wb')
+            self._wav.setnchannels(channels)
+            self._wav.setsampwidth(2)
+            self._wav.setframerate(sample_rate)
+
+    def write(self, separated):
+        if self.output_format == 'npy':
+            self._array[self._position:self._position + len(separated)] = separated
+            self._position += len(separated)
+        else:
+            pcm = np.clip(separated * WAV_OUTPUT_SCALE, -1, 1) * 32767
+            self._wav.writeframes(pcm.astype('<i2').tobytes())
+
+    def close(self):
+        if self.output_format == 'npy':
+            self._array.flush()
+            self._array = None
+        else:
+            self._wav.close()
+
+
+def separate_file(path, output_dir, config, output_format='wav', gating=False):
+    """
+    Separa uma gravação janela a janela, sem carregá-la inteira na memória.
+
+    :param gating: Usa o ActivityGate (config.activity_gating é ignorado).
+    :return: Resumo com número de janelas, janelas zeradas, decisões do gate, duração do
+             áudio e tempo de processamento.
+    """
+    start_time = time.perf_counter()
+    path = Path(path)
+    reader = open_recording(path, config.sample_rate)
+    config = replace(config, sample_rate=reader.sample_rate, channels=reader.channels,
+                     activity_gating=gating)
+    pipeline = SignalPipeline(config, SignalProcessor(config))
+
+    n_windows = reader.n_frames // config.window_size
+    stem = Path(output_dir) / f"{path.stem}_separated"
+    writer = SeparatedWriter(stem, n_windows * config.window_size, config.n_components,
+                             config.sample_rate, output_format)
+    metrics_path = Path(output_dir) / f"{path.stem}_metrics.csv"
+
+    processed = 0
+    try:
+        with open(metrics_path, 'w', newline='') as metrics_file:
+            metrics_writer = None
+            for index in range(n_windows):
+                window = reader.read(config.window_size)
+                data = pipeline.normalize(window)
+                result = pipeline.process(data) if data is not None else None
+
+                if result is None:
+                    # Janela em silêncio ou falha do ICA: mantém o alinhamento temporal
+                    writer.write(np.zeros((config.window_size, config.n_components), dtype=np.float32))
+                    continue
+
+                writer.write(result.separated)
+                if metrics_writer is None:
+                    metrics_writer = csv.writer(metrics_file)
+                    metrics_writer.writerow(['window', 'start_frame', *result.metrics.keys()])
+                metrics_writer.writerow([index, index * config.window_size,
+                                         *(float(value) for value in result.metrics.values())])
+                processed += 1
+    finally:
+        writer.close()
+        reader.close()
+
+    elapsed = time.perf_counter() - start_time
+    audio_seconds = n_windows * config.window_size / config.sample_rate
+    return {
+        "file": str(path),
+        "output": str(writer.path),
+        "windows": n_windows,
+        "processed_windows": processed,
+        "zeroed_windows": n_windows - processed,
+        "gate": {decision: pipeline.stats.counters[f"gate_{decision}"] for decision in GATE_DECISIONS}
+        if gating else None,
+        "audio_seconds": audio_seconds,
+        "elapsed": elapsed,
+        "realtime_factor": audio_seconds / elapsed if elapsed > 0 else float('inf'),
+    }
+
+
+def _init_worker(log_level):
+    """Inicializa cada processo: logging e BLAS com uma thread (o paralelismo é por arquivo)"""
+    logging.basicConfig(level=log_level, force=True,
+                        format='%(asctime)s - %(levelname)s - [%(processName)s] %(message)s')
+    limit_blas_threads(1)
+
+
+def run_batch(paths, output_dir, config, workers=None, output_format='wav', log_level=logging.WARNING,
+              gating=False):
+    """Distribui as gravações entre processos e retorna os resumos e o throughput agregado"""
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count()
+    start_time = time.perf_counter()
+    summaries = []
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(log_level,)) as executor:
+        futures = {executor.submit(separate_file, path, output_dir, config, output_format,
+                                   gating): path
+                   for path in paths}
+        for future in as_completed(futures):
+            try:
+                summary = future.result()
+                summaries.append(summary)
+                gate = f", gate {summary['gate']}" if summary['gate'] is not None else ""
+                logging.info(f"{summary['file']}: {summary['windows']} janelas, "
+                             f"{summary['zeroed_windows']} zeradas{gate}, "
+                             f"fator de tempo real {summary['realtime_factor']:.1f}x")
+            except Exception as e:
+                logging.error(f"Erro ao processar {futures[future]}: {e}", exc_info=True)
+
+    elapsed = time.perf_counter() - start_time
+    audio_seconds = sum(summary['audio_seconds'] for summary in summaries)
+    totals = {
+        "files": len(summaries),
+        "zeroed_windows": sum(summary['zeroed_windows'] for summary in summaries),
+        "workers": workers,
+        "elapsed": elapsed,
+        "files_per_minute": 60 * len(summaries) / elapsed if elapsed > 0 else float('inf'),
+        "realtime_factor": audio_seconds / elapsed if elapsed > 0 else float('inf'),
+    }
+    return summaries, totals
+
+
+def parse_args(argv=None):
+    defaults = AudioConfig()
+    parser = argparse.ArgumentParser(description="Separação ICA em lote de gravações WAV/NPY")
+    parser.add_argument('inputs', nargs='+', help="Gravações WAV PCM ou .npy (frames, canais)")
+    parser.add_argument('-o', '--output-dir', default='separated', help="Diretório de saída")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Número de processos (padrão: número de núcleos)")
+    parser.add_argument('--format', choices=['wav', 'npy'], default='wav', dest='output_format',
+                        help="Formato das faixas separadas")
+    parser.add_argument('--sample-rate', type=int, default=defaults.sample_rate,
+                        help="Taxa de amostragem assumida para arquivos .npy")
+    parser.add_argument('--window-size', type=int, default=defaults.window_size)
+    parser.add_argument('--n-components', type=int, default=defaults.n_components)
+    parser.add_argument('--ica-mode', choices=['batch', 'incremental'], default=defaults.ica_mode)
+    parser.add_argument('--ica-engine', choices=sorted(ENGINES), default=defaults.ica_engine)
+    parser.add_argument('--gating', action='store_true',
+                        help="Zera janelas abaixo de min_signal_threshold e reaplica matrizes em cache")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Logging detalhado por janela")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    log_level = logging.INFO if args.verbose else logging.WARNING
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - [%(processName)s] %(message)s')
+
+    config = AudioConfig(window_size=args.window_size,
+                         sample_rate=args.sample_rate,
+                         n_components=args.n_components,
+                         ica_mode=args.ica_mode, ica_engine=args.ica_engine)
+    summaries, totals = run_batch(args.inputs, args.output_dir, config, args.workers,
+                                  args.output_format, log_level, args.gating)
+
+    logging.info(f"{totals['files']} arquivos em {totals['elapsed']:.1f} s com {totals['workers']} processos: "
+                 f"{totals['files_per_minute']:.1f} arquivos/min, "
+                 f"{totals['zeroed_windows']} janelas zeradas, "
+                 f"fator de tempo real {totals['realtime_factor']:.1f}x")
+    return 0 if len(summaries) == len(args.inputs) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
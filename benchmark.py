@@ -0,0 +1,635 @@
+"""
+Benchmark de desempenho e qualidade do pipeline de separação, sem hardware de áudio.
+
+Gera fontes sintéticas conhecidas, mistura-as com matrizes aleatórias e mede, para cada
+combinação de parâmetros:
+    - latência por janela (p50/p95) e janelas por segundo do SignalProcessor;
+    - pico de memória alocada durante o processamento (tracemalloc);
+    - qualidade da separação (SDR/SIR em dB, no estilo BSS Eval) contra as fontes originais.
+Também mede as métricas do SignalAnalysis e, se PyQt5 e sounddevice estiverem instalados,
+o caminho completo do AudioProcessor (callback → buffer → worker → renderização).
+
+Os resultados são gravados em JSON e podem ser comparados com uma linha de base:
+    python benchmark.py --output atual.json --compare baseline.json
+"""
+import argparse
+import itertools
+import json
+import logging
+import platform
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, replace
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from audio_config import AudioConfig
+from ica_engines import ENGINES
+from signal_analysis import METRIC_NAMES, SignalAnalysis
+from signal_pipeline import SignalPipeline
+from signal_processor import SignalProcessor
+
+
+def synthetic_sources(n_sources, n_samples, sample_rate=44100, seed=0):
+    """
+    Fontes independentes e determinísticas, de estatísticas variadas (sub e super-gaussianas).
+
+    :return: Array (n_samples, n_sources) com variância unitária por coluna.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_samples) / sample_rate
+    generators = [
+        lambda f: np.sin(2 * np.pi * f * t),
+        lambda f: 2 * ((f * t) % 1.0) - 1,  # dente de serra
+        lambda f: rng.laplace(size=n_samples),
+        lambda f: np.sign(np.sin(2 * np.pi * f * t)),  # quadrada
+        lambda f: np.sin(2 * np.pi * f * t) * (1 + 0.5 * np.sin(2 * np.pi * 3 * t)),  # AM
+        lambda f: rng.uniform(-1, 1, size=n_samples),
+    ]
+    sources = np.empty((n_samples, n_sources))
+    for i in range(n_sources):
+        frequency = rng.uniform(110, 880)
+        sources[:, i] = generators[i % len(generators)](frequency)
+    sources -= sources.mean(axis=0)
+    sources /= sources.std(axis=0)
+    return sources
+
+
+def random_mixing(n_channels, n_sources, seed=0, max_condition=10.0):
+    """Matriz de mistura aleatória (n_channels, n_sources) razoavelmente bem condicionada"""
+    rng = np.random.default_rng(seed)
+    while True:
+        mixing = rng.uniform(0.2, 1.0, size=(n_channels, n_sources))
+        if np.linalg.cond(mixing) <= max_condition:
+            return mixing
+
+
+def synthetic_mixture(n_sources, n_samples, n_channels=None, sample_rate=44100, seed=0):
+    """Fontes, matriz de mistura e misturas (n_samples, n_channels) em float32"""
+    n_channels = n_channels or n_sources
+    sources = synthetic_sources(n_sources, n_samples, sample_rate, seed)
+    mixing = random_mixing(n_channels, n_sources, seed)
+    mixtures = (sources @ mixing.T).astype(np.float32)
+    mixtures *= 0.5 / np.abs(mixtures).max()
+    return sources, mixing, mixtures
+
+
+def convolutive_mixture(n_sources, n_samples, n_channels=None, filter_length=16, sample_rate=44100, seed=0):
+    """
+    Misturas convolutivas: cada par fonte → canal passa por um filtro FIR aleatório curto
+    (caminho direto mais reflexões que decaem), como em uma sala pequena.
+
+    :return: (fontes, filtros (canais, fontes, filter_length), misturas float32)
+    """
+    n_channels = n_channels or n_sources
+    rng = np.random.default_rng(seed)
+    sources = synthetic_sources(n_sources, n_samples, sample_rate, seed)
+    decay = np.exp(-np.arange(filter_length) / (filter_length / 4))
+    filters = rng.normal(size=(n_channels, n_sources, filter_length)) * decay * 0.3
+    filters[:, :, 0] = random_mixing(n_channels, n_sources, seed)
+    mixtures = np.zeros((n_samples, n_channels))
+    for channel in range(n_channels):
+        for source in range(n_sources):
+            mixtures[:, channel] += np.convolve(sources[:, source], filters[channel, source])[:n_samples]
+    mixtures = mixtures.astype(np.float32)
+    mixtures *= 0.5 / np.abs(mixtures).max()
+    return sources, filters, mixtures
+
+
+def separation_quality(estimated, sources, filter_length=1):
+    """
+    SDR e SIR (dB) de uma janela, resolvendo a permutação e a escala do ICA.
+
+    Cada estimativa é projetada no subespaço das fontes verdadeiras: a parcela da fonte
+    associada é o alvo, as demais fontes são interferência e o resto é artefato. A
+    associação estimativa ↔ fonte maximiza o SDR total (algoritmo húngaro). Com
+    filter_length > 1 o subespaço inclui versões atrasadas de cada fonte (até
+    filter_length - 1 amostras), como no BSS Eval, de modo que distorções por filtragem
+    (misturas convolutivas) não contam como erro.
+
+    :return: (SDR médio, SIR médio) em dB.
+    """
+    sources = sources - sources.mean(axis=0)
+    estimated = estimated - estimated.mean(axis=0)
+    n_samples, n_sources = sources.shape
+    basis = np.zeros((n_samples, n_sources, filter_length))
+    for delay in range(filter_length):
+        basis[delay:, :, delay] = sources[:n_samples - delay]
+    basis = basis.reshape(n_samples, n_sources * filter_length)
+
+    coefficients = np.linalg.lstsq(basis, estimated, rcond=None)[0]  # (fontes * atrasos, estimativas)
+    projection = basis @ coefficients
+
+    n_estimates = estimated.shape[1]
+    sdr = np.empty((n_estimates, n_sources))
+    sir = np.empty((n_estimates, n_sources))
+    eps = np.finfo(np.float64).tiny
+    for i in range(n_estimates):
+        artifacts = estimated[:, i] - projection[:, i]
+        for j in range(n_sources):
+            columns = slice(j * filter_length, (j + 1) * filter_length)
+            target = basis[:, columns] @ coefficients[columns, i]
+            interference = projection[:, i] - target
+            target_energy = np.sum(target ** 2) + eps
+            sdr[i, j] = 10 * np.log10(target_energy / (np.sum((interference + artifacts) ** 2) + eps))
+            sir[i, j] = 10 * np.log10(target_energy / (np.sum(interference ** 2) + eps))
+
+    rows, cols = linear_sum_assignment(-sdr)
+    return float(sdr[rows, cols].mean()), float(sir[rows, cols].mean())
+
+
+def _latency_summary(latencies):
+    latencies = np.asarray(latencies) * 1000
+    return {"mean": float(latencies.mean()), "p50": float(np.percentile(latencies, 50)),
+            "p95": float(np.percentile(latencies, 95)), "max": float(latencies.max())}
+
+
+def _prepared_pipeline(config):
+    """SignalPipeline com o motor de ICA já criado: a importação (~1 s no sklearn) fica fora das medições"""
+    processor = SignalProcessor(config)
+    processor.prepare()
+    return SignalPipeline(config, processor)
+
+
+def case_key(params):
+    """Identificador estável de uma combinação de parâmetros"""
+    return " ".join(f"{name}={params[name]}" for name in sorted(params))
+
+
+def bench_signal_processor(config, n_windows=50, memory_windows=10, seed=0):
+    """
+    Mede o SignalProcessor (via SignalPipeline.normalize) em janelas consecutivas.
+
+    :return: Dicionário com latência, throughput, pico de memória e SDR/SIR.
+    """
+    n_samples = n_windows * config.window_size
+    sources, _, mixtures = synthetic_mixture(config.n_components, n_samples, config.channels,
+                                             config.sample_rate, seed)
+    pipeline = _prepared_pipeline(config)
+
+    latencies, sdrs, sirs = [], [], []
+    for index in range(n_windows):
+        window = slice(index * config.window_size, (index + 1) * config.window_size)
+        window_start = time.perf_counter()
+        data = pipeline.normalize(mixtures[window])
+        separated = pipeline.signal_processor.process(data)
+        latencies.append(time.perf_counter() - window_start)
+        if separated is not None:
+            sdr, sir = separation_quality(separated, sources[window])
+            sdrs.append(sdr)
+            sirs.append(sir)
+    processing_time = sum(latencies)
+
+    # Pico de memória em uma passada separada (o tracemalloc distorce as latências)
+    memory_processor = SignalProcessor(config)
+    memory_processor.prepare()
+    tracemalloc.start()
+    for index in range(memory_windows):
+        window = slice(index * config.window_size, (index + 1) * config.window_size)
+        memory_processor.process(pipeline.normalize(mixtures[window]))
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "latency_ms": _latency_summary(latencies),
+        "windows_per_second": n_windows / processing_time,
+        "realtime_factor": n_samples / config.sample_rate / processing_time,
+        "peak_memory_bytes": peak_memory,
+        "sdr_db": float(np.mean(sdrs)) if sdrs else None,
+        "sir_db": float(np.mean(sirs)) if sirs else None,
+    }
+
+
+def bench_fft_scaling(config, fft_sizes, n_windows=20, filter_length=16, min_sir_db=15.0, seed=0):
+    """
+    Custo e qualidade do motor "stft" em função do tamanho da FFT, sobre misturas
+    convolutivas, comparado ao FastICA no domínio do tempo na mesma entrada.
+
+    A varredura mantém a sobreposição da configuração (stft_fft_size / stft_hop_size). A
+    configuração padrão do motor é sempre medida e precisa atingir min_sir_db.
+
+    :return: (resultados, falhas de qualidade em texto).
+    """
+    n_samples = n_windows * config.window_size
+    sources, _, mixtures = convolutive_mixture(config.n_components, n_samples, config.channels,
+                                               filter_length, config.sample_rate, seed)
+    overlap = config.stft_fft_size // config.stft_hop_size
+    engines = [("fastica", replace(config, ica_engine="fastica"))]
+    engines += [(f"stft/{fft_size}", replace(config, ica_engine="stft", stft_fft_size=fft_size,
+                                             stft_hop_size=max(1, fft_size // overlap)))
+                for fft_size in sorted(set(fft_sizes) | {config.stft_fft_size})]
+
+    results, failures = [], []
+    for name, engine_config in engines:
+        pipeline = _prepared_pipeline(engine_config)
+        latencies, qualities = [], []
+        for index in range(n_windows):
+            window = slice(index * config.window_size, (index + 1) * config.window_size)
+            start_time = time.perf_counter()
+            separated = pipeline.signal_processor.process(pipeline.normalize(mixtures[window]))
+            latencies.append(time.perf_counter() - start_time)
+            qualities.append(separation_quality(separated, sources[window], filter_length))
+        sdr, sir = np.mean(qualities, axis=0)
+        is_default = name != "fastica" and engine_config.stft_fft_size == config.stft_fft_size
+        results.append({"engine": name, "fft_size": engine_config.stft_fft_size if name != "fastica" else None,
+                        "default": is_default, "latency_ms": _latency_summary(latencies),
+                        "sdr_db": float(sdr), "sir_db": float(sir)})
+        if is_default and sir < min_sir_db:
+            failures.append(f"{name} (padrão): SIR {sir:.1f} dB abaixo do mínimo de {min_sir_db:.1f} dB")
+    return results, failures
+
+
+def bench_gating(config, n_windows=200, active_fraction=0.2, mixing_changes=2, seed=0):
+    """
+    Alimentação majoritariamente ociosa: ruído abaixo de min_signal_threshold, com trechos
+    ativos cuja mistura muda `mixing_changes` vezes. Compara o pipeline com e sem o gate
+    de atividade em tempo de CPU, fração de janelas por decisão e SIR das janelas ativas.
+    """
+    rng = np.random.default_rng(seed)
+    n_samples = n_windows * config.window_size
+    sources = synthetic_sources(config.n_components, n_samples, config.sample_rate, seed)
+    segments = np.array_split(np.arange(n_windows), mixing_changes + 1)
+    mixtures = np.empty((n_samples, config.channels))
+    for index, windows in enumerate(segments):
+        samples = slice(windows[0] * config.window_size, (windows[-1] + 1) * config.window_size)
+        mixtures[samples] = sources[samples] @ random_mixing(config.channels, config.n_components, seed + index).T
+    mixtures *= 0.5 / np.abs(mixtures).max()
+
+    active = np.zeros(n_windows, dtype=bool)
+    active[:int(round(active_fraction * n_windows))] = True
+    rng.shuffle(active)
+    noise = rng.normal(scale=config.min_signal_threshold / 10, size=mixtures.shape)
+    for index in np.flatnonzero(~active):
+        window = slice(index * config.window_size, (index + 1) * config.window_size)
+        mixtures[window] = noise[window]
+    mixtures = mixtures.astype(np.float32)
+
+    results = {}
+    for gating in (False, True):
+        gated_config = replace(config, activity_gating=gating, metrics_log_path="")
+        pipeline = _prepared_pipeline(gated_config)
+        sirs = []
+        cpu_start = time.process_time()
+        for index in range(n_windows):
+            window = slice(index * config.window_size, (index + 1) * config.window_size)
+            data = pipeline.normalize(mixtures[window])
+            if data is None:
+                continue
+            result = pipeline.process(data)
+            if result is not None and active[index]:
+                sirs.append(separation_quality(result.separated, sources[window])[1])
+        cpu_seconds = time.process_time() - cpu_start
+        results["gated" if gating else "ungated"] = {
+            "cpu_ms_per_window": cpu_seconds * 1000 / n_windows,
+            "sir_db": float(np.mean(sirs)) if sirs else None,
+            "shares": pipeline.gate.shares() if pipeline.gate is not None else None,
+        }
+    results["cpu_reduction"] = (results["ungated"]["cpu_ms_per_window"]
+                                / max(results["gated"]["cpu_ms_per_window"], 1e-9))
+    return results
+
+
+def bench_allocations(config, engines=("fastica", "numpy"), n_windows=30, warmup=5, seed=0):
+    """
+    Memória alocada por janela no caminho normalize → ICA → métricas, em regime.
+
+    O tracemalloc só acompanha blocos vivos, então por janela são medidos o pico de
+    memória temporária acima do estado anterior (bytes e equivalente em janelas float32)
+    e a memória retida ao final da janela. A meta em regime é zero alocações do tamanho da
+    janela: o pico fica restrito a estatísticas pequenas.
+    """
+    n_samples = (warmup + n_windows) * config.window_size
+    _, _, mixtures = synthetic_mixture(config.n_components, n_samples, config.channels, config.sample_rate, seed)
+    window_bytes = config.window_size * config.channels * np.dtype(np.float32).itemsize
+
+    results = []
+    for engine in engines:
+        engine_config = replace(config, ica_engine=engine, activity_gating=False)
+        pipeline = _prepared_pipeline(engine_config)
+        peaks, retained = [], []
+        tracemalloc.start()
+        for index in range(warmup + n_windows):
+            window = mixtures[index * config.window_size:(index + 1) * config.window_size]
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            pipeline.process(pipeline.normalize(window))
+            current, peak = tracemalloc.get_traced_memory()
+            if index >= warmup:
+                peaks.append(peak - before)
+                retained.append(current - before)
+        tracemalloc.stop()
+        results.append({
+            "engine": engine,
+            "peak_bytes_per_window": float(np.mean(peaks)),
+            "peak_windows_per_window": float(np.mean(peaks) / window_bytes),
+            "retained_bytes_per_window": float(np.mean(retained)),
+        })
+    return results
+
+
+def bench_metrics(n_components=2, window_size=2048, repeats=200, seed=0):
+    """Compara as seis métricas individuais (legado) com SignalAnalysis.pairwise_metrics"""
+    signals = synthetic_sources(n_components, window_size, seed=seed)
+    pairs = list(itertools.combinations(range(n_components), 2))
+    individual = [SignalAnalysis.euclidean_distance, SignalAnalysis.cross_correlation,
+                  SignalAnalysis.pearson_distance, SignalAnalysis.mean_squared_error,
+                  SignalAnalysis.cosine_distance, SignalAnalysis.cross_entropy]
+
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        for i, j in pairs:
+            for metric in individual:
+                metric(signals[:, i], signals[:, j])
+    legacy = (time.perf_counter() - start_time) / repeats
+
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        SignalAnalysis.pairwise_metrics(signals)
+    fused = (time.perf_counter() - start_time) / repeats
+
+    return {"n_components": n_components, "window_size": window_size, "metrics": list(METRIC_NAMES),
+            "legacy_ms": legacy * 1000, "fused_ms": fused * 1000, "speedup": legacy / fused}
+
+
+class _NullDeviceManager:
+    def setup_device(self):
+        pass
+
+
+class _NullVisualizer:
+    def update_plot(self, metrics):
+        pass
+
+
+def bench_audio_processor(config, n_blocks=50, seed=0):
+    """
+    Caminho completo do AudioProcessor sem dispositivo nem janela: os blocos sintéticos são
+    entregues ao audio_callback o mais rápido que o buffer circular aceitar, e a
+    "renderização" é um visualizador nulo chamado a cada bloco.
+
+    :return: Dicionário com throughput e o snapshot das estatísticas do pipeline.
+    """
+    from audio_processor import AudioProcessor
+
+    _, _, mixtures = synthetic_mixture(config.n_components, n_blocks * config.buffer_size, config.channels,
+                                       config.sample_rate, seed)
+    with tempfile.TemporaryDirectory() as directory:
+        config = replace(config, recording_dir=directory, metrics_log_path="")
+        processor = AudioProcessor(config, _NullDeviceManager(), SignalProcessor(config), _NullVisualizer())
+        processor.signal_processor.prepare()
+        processor.worker.start()
+
+        start_time = time.perf_counter()
+        for index in range(n_blocks):
+            block = mixtures[index * config.buffer_size:(index + 1) * config.buffer_size]
+            while processor.ring_buffer.free() < len(block):
+                processor.update_plot()
+                time.sleep(0.0005)
+            processor.audio_callback(block, len(block), None, None)
+            processor.update_plot()
+        while processor.ring_buffer.available() >= config.buffer_size:
+            processor.update_plot()
+            time.sleep(0.0005)
+        time.sleep(0.05)
+        processor.update_plot()
+        elapsed = time.perf_counter() - start_time
+
+        processor._cleanup()
+        snapshot = processor.stats_snapshot()
+
+    windows = snapshot["counters"].get("windows_processed", 0)
+    return {
+        "blocks": n_blocks,
+        "windows_processed": windows,
+        "windows_per_second": windows / elapsed,
+        "realtime_factor": n_blocks * config.buffer_size / config.sample_rate / elapsed,
+        "stats": snapshot,
+    }
+
+
+def bench_multistream(config, stream_counts, seconds_per_stream=10.0, seed=0, gating=False):
+    """
+    Throughput agregado do StreamSupervisor com 1..N fluxos sintéticos simultâneos.
+
+    Sem gating (padrão), toda janela passa pelo ICA completo; zeroed_windows conta as
+    janelas que saíram zeradas.
+
+    A eficiência de escala é o throughput com N fluxos dividido por N vezes o de um fluxo.
+    """
+    from stream_server import StreamSupervisor
+
+    n_samples = int(seconds_per_stream * config.sample_rate) // config.window_size * config.window_size
+    _, _, mixtures = synthetic_mixture(config.n_components, n_samples, config.channels, config.sample_rate, seed)
+    results = []
+    for n_streams in stream_counts:
+        supervisor = StreamSupervisor(config, n_streams, gating=gating)
+        supervisor.start()
+        try:
+            start_time = time.perf_counter()
+            positions = [0] * n_streams
+            collected = [0] * n_streams
+            while sum(collected) < n_streams * n_samples:
+                for stream_id in range(n_streams):
+                    position = positions[stream_id]
+                    block = mixtures[position:position + config.buffer_size]
+                    if len(block) and supervisor.free(stream_id) >= len(block):
+                        supervisor.push(stream_id, block)
+                        positions[stream_id] += len(block)
+                    collected[stream_id] += len(supervisor.read_results(stream_id))
+                time.sleep(0.0002)
+            elapsed = time.perf_counter() - start_time
+            streams = supervisor.stats()
+        finally:
+            supervisor.stop()
+
+        windows = sum(stream["windows_processed"] + stream["zeroed_windows"] for stream in streams)
+        results.append({"streams": n_streams, "elapsed": elapsed, "windows_per_second": windows / elapsed,
+                        "zeroed_windows": sum(stream["zeroed_windows"] for stream in streams),
+                        "realtime_factor": n_streams * n_samples / config.sample_rate / elapsed,
+                        "per_stream": streams})
+
+    single = next((result for result in results if result["streams"] == 1), None)
+    for result in results:
+        if single is not None:
+            result["scaling_efficiency"] = (result["windows_per_second"]
+                                            / (result["streams"] * single["windows_per_second"]))
+    return results
+
+
+def run_suite(window_sizes, channel_counts, components, ica_modes, max_iters, tols, n_windows=50, seed=0,
+              include_audio_processor=True, stream_counts=(), engines=("fastica",), fft_sizes=(),
+              stft_min_sir_db=15.0):
+    """
+    Executa a varredura de parâmetros e retorna o relatório completo.
+
+    Combinações com mais componentes que canais são ignoradas.
+    """
+    base = AudioConfig()
+    cases = []
+    for window_size, channels, n_components, engine, ica_mode, max_iter, tol in itertools.product(
+            window_sizes, channel_counts, components, engines, ica_modes, max_iters, tols):
+        if n_components > channels:
+            continue
+        params = {"window_size": window_size, "channels": channels, "n_components": n_components,
+                  "ica_engine": engine, "ica_mode": ica_mode, "ica_max_iter": max_iter, "ica_tol": tol}
+        config = replace(base, **params)
+        logging.info(f"Benchmark: {case_key(params)}")
+        cases.append({"key": case_key(params), "params": params,
+                      **bench_signal_processor(config, n_windows, seed=seed)})
+
+    report = {
+        "environment": {"python": platform.python_version(), "numpy": np.__version__,
+                        "machine": platform.machine(), "processor": platform.processor(),
+                        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "config": asdict(base),
+        "cases": cases,
+        "metrics": [bench_metrics(n, seed=seed) for n in sorted(set(components))],
+    }
+    if include_audio_processor:
+        report["audio_processor"] = bench_audio_processor(base, seed=seed)
+    report["gating"] = bench_gating(base, seed=seed)
+    report["allocations"] = bench_allocations(base, engines, seed=seed)
+    if fft_sizes:
+        report["fft_scaling"], report["quality_failures"] = bench_fft_scaling(
+            base, fft_sizes, min_sir_db=stft_min_sir_db, seed=seed)
+    if stream_counts:
+        report["multistream"] = bench_multistream(base, stream_counts, seed=seed)
+    return report
+
+
+def log_channel_scaling(cases):
+    """Resume a latência p50 por número de canais, para cada combinação dos demais parâmetros"""
+    groups = {}
+    for case in cases:
+        params = {name: value for name, value in case["params"].items() if name != "channels"}
+        groups.setdefault(case_key(params), []).append((case["params"]["channels"], case["latency_ms"]["p50"]))
+    for key, points in groups.items():
+        if len(points) > 1:
+            scaling = ", ".join(f"{channels} canais: {latency:.2f} ms" for channels, latency in sorted(points))
+            logging.info(f"Escala com canais ({key}): {scaling}")
+
+
+def log_engine_comparison(cases, reference="fastica"):
+    """Compara cada motor com o motor de referência (sklearn) nas mesmas condições"""
+    groups = {}
+    for case in cases:
+        params = {name: value for name, value in case["params"].items() if name != "ica_engine"}
+        groups.setdefault(case_key(params), {})[case["params"]["ica_engine"]] = case
+    for key, by_engine in groups.items():
+        baseline = by_engine.get(reference)
+        if baseline is None:
+            continue
+        for engine, case in by_engine.items():
+            if engine == reference:
+                continue
+            speedup = baseline["latency_ms"]["p50"] / case["latency_ms"]["p50"]
+            logging.info(f"{engine} x {reference} ({key}): {speedup:.1f}x mais rápido, "
+                         f"SIR {case['sir_db']:.1f} x {baseline['sir_db']:.1f} dB")
+
+
+def compare(baseline, current, latency_tolerance=0.25, quality_tolerance_db=1.0):
+    """
+    Compara dois relatórios caso a caso.
+
+    :param latency_tolerance: Aumento relativo máximo aceito na latência p50.
+    :param quality_tolerance_db: Queda máxima aceita no SIR médio.
+    :return: Lista de regressões encontradas (texto).
+    """
+    baseline_cases = {case["key"]: case for case in baseline.get("cases", [])}
+    regressions = []
+    for case in current.get("cases", []):
+        reference = baseline_cases.get(case["key"])
+        if reference is None:
+            continue
+        old_latency, new_latency = reference["latency_ms"]["p50"], case["latency_ms"]["p50"]
+        if new_latency > old_latency * (1 + latency_tolerance):
+            regressions.append(f"{case['key']}: latência p50 {old_latency:.2f} → {new_latency:.2f} ms")
+        if reference.get("sir_db") is not None and case.get("sir_db") is not None:
+            if case["sir_db"] < reference["sir_db"] - quality_tolerance_db:
+                regressions.append(f"{case['key']}: SIR {reference['sir_db']:.1f} → {case['sir_db']:.1f} dB")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de desempenho e qualidade do ICA")
+    parser.add_argument('--window-sizes', type=int, nargs='+', default=[1024, 2048, 4096])
+    parser.add_argument('--channels', type=int, nargs='+', default=[2, 4, 8, 16],
+                        help="Canais capturados (misturas sobredeterminadas quando > componentes)")
+    parser.add_argument('--components', type=int, nargs='+', default=[2, 3, 4])
+    parser.add_argument('--engines', nargs='+', default=['fastica', 'numpy'], choices=sorted(ENGINES),
+                        help="Motores de separação comparados")
+    parser.add_argument('--ica-modes', nargs='+', default=['batch', 'incremental'])
+    parser.add_argument('--max-iters', type=int, nargs='+', default=[200])
+    parser.add_argument('--tols', type=float, nargs='+', default=[0.01])
+    parser.add_argument('--windows', type=int, default=50, help="Janelas por caso")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-audio-processor', action='store_true',
+                        help="Não mede o caminho completo do AudioProcessor")
+    parser.add_argument('--fft-sizes', type=int, nargs='*', default=[128, 256, 512, 1024],
+                        help="Tamanhos de FFT do motor stft (misturas convolutivas)")
+    parser.add_argument('--stft-min-sir', type=float, default=15.0,
+                        help="SIR mínimo (dB) do motor stft na configuração padrão")
+    parser.add_argument('--streams', type=int, nargs='*', default=[],
+                        help="Números de fluxos simultâneos para medir a escala do StreamSupervisor")
+    parser.add_argument('-o', '--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help="Relatório de linha de base para detectar regressões")
+    parser.add_argument('--latency-tolerance', type=float, default=0.25)
+    parser.add_argument('--quality-tolerance', type=float, default=1.0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    logging.getLogger().setLevel(logging.INFO)
+
+    report = run_suite(args.window_sizes, args.channels, args.components, args.ica_modes, args.max_iters, args.tols,
+                       args.windows, args.seed, not args.no_audio_processor, args.streams,
+                       args.engines, args.fft_sizes, args.stft_min_sir)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for case in report["cases"]:
+        logging.info(f"{case['key']}: p50 {case['latency_ms']['p50']:.2f} ms, "
+                     f"{case['windows_per_second']:.0f} janelas/s, "
+                     f"pico {case['peak_memory_bytes'] / 1024:.0f} KiB, "
+                     f"SDR {case['sdr_db']:.1f} dB, SIR {case['sir_db']:.1f} dB")
+    log_channel_scaling(report["cases"])
+    log_engine_comparison(report["cases"])
+    for result in report["allocations"]:
+        logging.info(f"Alocações ({result['engine']}): pico {result['peak_bytes_per_window'] / 1024:.1f} KiB/janela "
+                     f"({result['peak_windows_per_window']:.2f} janelas), "
+                     f"retido {result['retained_bytes_per_window']:.0f} B/janela")
+    gating = report["gating"]
+    logging.info(f"Gate de atividade: {gating['cpu_reduction']:.1f}x menos CPU "
+                 f"({gating['ungated']['cpu_ms_per_window']:.2f} → {gating['gated']['cpu_ms_per_window']:.2f} ms/janela), "
+                 f"SIR {gating['ungated']['sir_db']:.1f} → {gating['gated']['sir_db']:.1f} dB, "
+                 f"decisões {gating['gated']['shares']}")
+    for result in report.get("fft_scaling", []):
+        logging.info(f"Convolutiva, {result['engine']}{' (padrão)' if result['default'] else ''}: "
+                     f"p50 {result['latency_ms']['p50']:.2f} ms, "
+                     f"SDR {result['sdr_db']:.1f} dB, SIR {result['sir_db']:.1f} dB")
+    quality_failures = report.get("quality_failures", [])
+    for failure in quality_failures:
+        logging.error(f"Qualidade insuficiente: {failure}")
+    for result in report.get("multistream", []):
+        logging.info(f"{result['streams']} fluxos: {result['windows_per_second']:.0f} janelas/s, "
+                     f"fator de tempo real {result['realtime_factor']:.1f}x, "
+                     f"eficiência {result.get('scaling_efficiency', float('nan')):.0%}, "
+                     f"{result['zeroed_windows']} janelas zeradas")
+    logging.info(f"Relatório gravado em {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.latency_tolerance, args.quality_tolerance)
+        for regression in regressions:
+            logging.error(f"Regressão: {regression}")
+        return 1 if regressions or quality_failures else 0
+    return 1 if quality_failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
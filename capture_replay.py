@@ -0,0 +1,462 @@
+"""
+Captura dos blocos brutos do callback de áudio e reprodução pelo mesmo caminho.
+
+O arquivo de captura (.icacap) tem um cabeçalho fixo seguido de um registro por bloco
+entregue ao audio_callback:
+
+    cabeçalho:  magic "ICACAP" + versão (uint16), sample_rate (uint32), canais (uint32)
+    registro:   instante (float64, s desde o início da captura), frames (uint32),
+                flags de status do PortAudio (uint32), amostras float32 (frames x canais)
+
+A gravação no disco fica em uma thread própria; o callback só copia o bloco para um
+buffer circular pré-alocado. Uma captura interrompida no meio de um registro é lida até o último bloco completo.
+
+A reprodução (ReplayStream) tem a mesma interface de sounddevice.InputStream usada pelo
+AudioProcessor e chama o audio_callback com os blocos e as flags originais, no ritmo da
+captura (1x), N vezes mais rápido ou sem limite (speed=0). Assim xruns e estouros do buffer
+circular se repetem sem o dispositivo, e o pipeline completo pode ser medido na vazão
+máxima em máquinas sem áudio nem interface.
+
+Uso:
+    python capture_replay.py info captura.icacap
+    python capture_replay.py replay captura.icacap --speed 0 --backpressure
+    python capture_replay.py from-recording gravacao.wav captura.icacap
+"""
+
+import argparse
+import json
+import logging
+import struct
+import tempfile
+import threading
+import time
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+
+from ring_buffer import RingBuffer
+
+MAGIC = b"ICACAP"
+VERSION = 1
+FILE_HEADER = struct.Struct("<6sHII")  # magic, versão, sample_rate, canais
+BLOCK_HEADER = struct.Struct("<dII")  # instante, frames, flags de status
+
+# Bits de PaStreamCallbackFlags, com os nomes das propriedades de sounddevice.CallbackFlags
+STATUS_FLAGS = {
+    "input_underflow": 0x1,
+    "input_overflow": 0x2,
+    "output_underflow": 0x4,
+    "output_overflow": 0x8,
+    "priming_output": 0x10,
+}
+
+
+def status_to_flags(status):
+    """Converte o status do callback (sounddevice.CallbackFlags ou None) em bits do PortAudio"""
+    if not status:
+        return 0
+    flags = 0
+    for name, bit in STATUS_FLAGS.items():
+        if getattr(status, name, False):
+            flags |= bit
+    return flags or 0x80000000  # Status sinalizado sem bit conhecido
+
+
+class ReplayStatus:
+    """Status reproduzido com a interface de sounddevice.CallbackFlags usada no callback"""
+
+    def __init__(self, flags):
+        self.flags = flags
+
+    def __bool__(self):
+        return bool(self.flags)
+
+    def __getattr__(self, name):
+        if name in STATUS_FLAGS:
+            return bool(self.flags & STATUS_FLAGS[name])
+        raise AttributeError(name)
+
+    def __str__(self):
+        names = [name.replace('_', ' ') for name, bit in STATUS_FLAGS.items() if self.flags & bit]
+        return ", ".join(names) or f"flags {self.flags:#x}"
+
+
+class ReplayTimeInfo:
+    """time_info reproduzido: inputBufferAdcTime no relógio do stream de reprodução"""
+
+    __slots__ = ("inputBufferAdcTime", "currentTime", "outputBufferDacTime")
+
+    def __init__(self, adc_time, current_time):
+        self.inputBufferAdcTime = adc_time
+        self.currentTime = current_time
+        self.outputBufferDacTime = 0.0
+
+
+class CaptureWriter:
+    """
+    Grava os blocos do callback em um arquivo .icacap.
+
+    O callback só copia o bloco para um RingBuffer pré-alocado e o cabeçalho do bloco para
+    arrays de registros também pré-alocados, sem alocação nem lock (um produtor e um
+    consumidor, como no RingBuffer); uma thread própria drena os dois para o disco. Se a
+    thread não acompanhar, o bloco é descartado e contado em dropped_blocks, sem bloquear
+    o callback.
+    """
+
+    def __init__(self, path, sample_rate, channels, buffer_seconds=10.0, max_blocks=4096, poll_interval=0.02):
+        """
+        :param path: Arquivo de destino.
+        :param buffer_seconds: Áudio que pode aguardar a gravação antes de haver descarte.
+        :param max_blocks: Blocos que podem aguardar a gravação.
+        :param poll_interval: Intervalo (s) entre as drenagens da thread de gravação.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.poll_interval = poll_interval
+        self.blocks = 0
+        self.dropped_blocks = 0
+        self._frames = RingBuffer(int(buffer_seconds * sample_rate), channels)
+        self._times = np.zeros(max_blocks)
+        self._sizes = np.zeros(max_blocks, dtype=np.uint32)
+        self._flags = np.zeros(max_blocks, dtype=np.uint32)
+        self._write_index = 0  # Registros escritos (produtor)
+        self._read_index = 0  # Registros gravados (consumidor)
+        self._start_time = None
+        self._adc_clock = False
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._write_loop, name="CaptureWriter", daemon=True)
+        self._thread.start()
+
+    def write(self, block, status=None, time_info=None):
+        """
+        Copia um bloco para a fila de gravação (chamado no callback de áudio).
+
+        :param block: Array (frames, canais).
+        :param status: Status do callback.
+        :param time_info: time_info do callback; o bloco é datado por inputBufferAdcTime
+                          (relógio do stream) ou, sem ele, por time.perf_counter().
+        :return: False se o bloco foi descartado por falta de espaço.
+        """
+        if self._start_time is None:
+            self._adc_clock = time_info is not None and time_info.inputBufferAdcTime > 0
+        timestamp = time_info.inputBufferAdcTime if self._adc_clock else time.perf_counter()
+        if self._start_time is None:
+            self._start_time = timestamp
+
+        index = self._write_index % len(self._times)
+        if self._write_index - self._read_index >= len(self._times) or not self._frames.write(block, timestamp):
+            self.dropped_blocks += 1
+            return False
+        self._times[index] = timestamp - self._start_time
+        self._sizes[index] = len(block)
+        self._flags[index] = status_to_flags(status)
+        self._write_index += 1
+        return True
+
+    def free(self):
+        """Frames que podem ser escritos sem descarte (0 se não há registro livre)"""
+        if self._write_index - self._read_index >= len(self._times):
+            return 0
+        return self._frames.free()
+
+    def close(self):
+        self._stop_event.set()
+        self._thread.join(timeout=5.0)
+        if self.dropped_blocks:
+            logging.warning(f"Captura: {self.dropped_blocks} blocos descartados (gravação não acompanhou)")
+        logging.info(f"Captura de {self.blocks} blocos gravada em {self.path}")
+
+    def _write_loop(self):
+        with open(self.path, 'wb') as f:
+            f.write(FILE_HEADER.pack(MAGIC, VERSION, self.sample_rate, self.channels))
+            while True:
+                stopping = self._stop_event.is_set()
+                if self._drain(f):
+                    f.flush()
+                if stopping:
+                    break
+                self._stop_event.wait(self.poll_interval)
+
+    def _drain(self, f):
+        """Grava os registros pendentes; retorna quantos foram gravados"""
+        count = 0
+        while self._read_index < self._write_index:
+            index = self._read_index % len(self._times)
+            n_frames = int(self._sizes[index])
+            f.write(BLOCK_HEADER.pack(float(self._times[index]), n_frames, int(self._flags[index])))
+            f.write(memoryview(self._frames.peek(n_frames)))
+            self._frames.advance(n_frames)
+            self._read_index += 1
+            self.blocks += 1
+            count += 1
+        return count
+
+
+class CaptureReader:
+    """
+    Leitura de um arquivo .icacap em memory map: os blocos são visões do arquivo, sem cópia.
+
+    Iterar produz tuplas (instante, flags, bloco (frames, canais) float32 somente leitura).
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._data = np.memmap(self.path, dtype=np.uint8, mode='r')
+        if len(self._data) < FILE_HEADER.size:
+            raise ValueError(f"{self.path}: arquivo de captura vazio ou truncado")
+        magic, version, self.sample_rate, self.channels = FILE_HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path}: não é um arquivo de captura")
+        if version != VERSION:
+            raise ValueError(f"{self.path}: versão de captura {version} não suportada")
+
+    def __iter__(self):
+        offset = FILE_HEADER.size
+        frame_bytes = 4 * self.channels
+        while offset + BLOCK_HEADER.size <= len(self._data):
+            timestamp, frames, flags = BLOCK_HEADER.unpack_from(self._data, offset)
+            offset += BLOCK_HEADER.size
+            if offset + frames * frame_bytes > len(self._data):
+                logging.warning(f"{self.path}: último bloco incompleto ignorado")
+                return
+            block = np.frombuffer(self._data, dtype=np.float32, count=frames * self.channels,
+                                  offset=offset).reshape(frames, self.channels)
+            offset += frames * frame_bytes
+            yield timestamp, flags, block
+
+    def summary(self):
+        """Número de blocos e frames, duração e contagem de cada flag de status"""
+        blocks = frames = 0
+        duration = 0.0
+        flag_counts = dict.fromkeys(STATUS_FLAGS, 0)
+        block_sizes = set()
+        for timestamp, flags, block in self:
+            blocks += 1
+            frames += len(block)
+            duration = timestamp
+            block_sizes.add(len(block))
+            for name, bit in STATUS_FLAGS.items():
+                if flags & bit:
+                    flag_counts[name] += 1
+        return {
+            "sample_rate": self.sample_rate,
+            "channels": self.channels,
+            "blocks": blocks,
+            "frames": frames,
+            "audio_seconds": frames / self.sample_rate,
+            "capture_seconds": duration,
+            "block_sizes": sorted(block_sizes),
+            "status_flags": flag_counts,
+        }
+
+
+class ReplayStream:
+    """
+    Fonte de entrada que reproduz uma captura pelo callback, com a interface de
+    sounddevice.InputStream (start, stop, close, active).
+
+    O callback é chamado em uma thread própria com (bloco, frames, time_info, status); o
+    inputBufferAdcTime de time_info preserva o espaçamento original dos blocos (em tempo
+    de captura), qualquer que seja a velocidade.
+    """
+
+    def __init__(self, path, callback, speed=1.0, wait_for_space=None):
+        """
+        :param path: Arquivo .icacap.
+        :param callback: Função com a assinatura do callback do sounddevice.
+        :param speed: 1 = ritmo da captura, N = N vezes mais rápido, 0 = sem limite.
+        :param wait_for_space: Função opcional que retorna quantos frames o consumidor aceita;
+                               com ela, cada bloco espera espaço em vez de ser descartado
+                               (vazão máxima sem estouros do buffer circular).
+        """
+        self.reader = CaptureReader(path)
+        self.callback = callback
+        self.speed = speed
+        self.wait_for_space = wait_for_space
+        self.blocks = 0
+        self.finished = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def active(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self._stop_event.clear()
+        self.finished.clear()
+        self._thread = threading.Thread(target=self._run, name="ReplayStream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+
+    def close(self):
+        self.stop()
+
+    def _run(self):
+        start_time = time.perf_counter()
+        try:
+            for timestamp, flags, block in self.reader:
+                if self._stop_event.is_set():
+                    return
+                if self.speed > 0:
+                    delay = start_time + timestamp / self.speed - time.perf_counter()
+                    if delay > 0 and self._stop_event.wait(delay):
+                        return
+                if self.wait_for_space is not None:
+                    while self.wait_for_space() < len(block):
+                        if self._stop_event.wait(0.0005):
+                            return
+                self.callback(block, len(block), ReplayTimeInfo(start_time + timestamp, time.perf_counter()),
+                              ReplayStatus(flags))
+                self.blocks += 1
+        except Exception as e:
+            logging.error(f"Erro na reprodução da captura: {e}", exc_info=True)
+        finally:
+            self.finished.set()
+
+
+class _HeadlessVisualizer:
+    def update_plot(self, metrics):
+        pass
+
+
+def replay_headless(path, config, speed=0.0, backpressure=True):
+    """
+    Reproduz uma captura pelo AudioProcessor completo, sem dispositivo nem interface.
+
+    :return: Dicionário com o tempo de reprodução, o fator sobre o tempo real e o snapshot
+             das estatísticas do pipeline.
+    """
+    from audio_processor import AudioProcessor
+    from signal_processor import SignalProcessor
+
+    summary = CaptureReader(path).summary()
+    block_size = max(summary["block_sizes"], default=config.buffer_size)
+    config = replace(config, sample_rate=summary["sample_rate"], channels=summary["channels"],
+                     buffer_size=block_size, replay_path=str(path), replay_speed=speed,
+                     replay_backpressure=backpressure, capture_path="")
+    processor = AudioProcessor(config, None, SignalProcessor(config), _HeadlessVisualizer())
+
+    start_time = time.perf_counter()
+    processor.start()
+    stream = processor.stream
+    if stream is None:
+        raise RuntimeError("Falha ao iniciar a reprodução")
+    while not stream.finished.wait(config.update_interval / 1000):
+        processor.update_plot()
+    # Drena o que ainda cabe em janelas completas
+    while processor.ring_buffer.available() >= config.window_size and processor.worker.is_alive():
+        processor.update_plot()
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start_time
+    processor.update_plot()
+    processor._cleanup()
+
+    return {
+        "capture": summary,
+        "speed": speed,
+        "backpressure": backpressure,
+        "elapsed": elapsed,
+        "realtime_factor": summary["audio_seconds"] / elapsed if elapsed else None,
+        "stats": processor.stats_snapshot(),
+    }
+
+
+def capture_from_recording(source, destination, config):
+    """Converte uma gravação WAV/NPY em captura, em blocos de buffer_size sem flags de status"""
+    from batch_separate import open_recording
+
+    reader = open_recording(source, config.sample_rate)
+    try:
+        writer = CaptureWriter(destination, reader.sample_rate, reader.channels)
+        start_time = time.perf_counter()
+        position = 0
+        while position < reader.n_frames:
+            block = reader.read(min(config.buffer_size, reader.n_frames - position))
+            while writer.free() < len(block):
+                time.sleep(writer.poll_interval)
+            writer.write(block, None, ReplayTimeInfo(start_time + position / reader.sample_rate, start_time))
+            position += len(block)
+        writer.close()
+    finally:
+        reader.close()
+
+
+def parse_args(argv=None):
+    from audio_config import AudioConfig
+    from ica_engines import ENGINES
+
+    defaults = AudioConfig()
+    parser = argparse.ArgumentParser(description="Captura e reprodução dos blocos do callback de áudio")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    info = commands.add_parser('info', help="Resumo de um arquivo de captura")
+    info.add_argument('capture')
+
+    replay_parser = commands.add_parser('replay', help="Reproduz uma captura pelo pipeline completo, sem interface")
+    replay_parser.add_argument('capture')
+    replay_parser.add_argument('--speed', type=float, default=0.0,
+                               help="1 = tempo real, N = N vezes mais rápido, 0 = sem limite")
+    replay_parser.add_argument('--backpressure', action='store_true',
+                               help="Espera espaço no buffer circular em vez de descartar blocos")
+    replay_parser.add_argument('--ica-engine', choices=sorted(ENGINES), default=defaults.ica_engine)
+    replay_parser.add_argument('--window-size', type=int, default=defaults.window_size)
+    replay_parser.add_argument('--hop-size', type=int, default=None)
+    replay_parser.add_argument('--scheduler-policy', default=defaults.scheduler_policy)
+    replay_parser.add_argument('--queue-size', type=int, default=defaults.queue_size)
+    replay_parser.add_argument('--recording-dir', default=None,
+                               help="Mantém a gravação dos resultados (padrão: diretório temporário)")
+    replay_parser.add_argument('-o', '--output', default=None, help="Relatório JSON")
+
+    convert = commands.add_parser('from-recording', help="Converte uma gravação WAV/NPY em captura")
+    convert.add_argument('recording')
+    convert.add_argument('capture')
+    convert.add_argument('--sample-rate', type=int, default=defaults.sample_rate)
+    convert.add_argument('--buffer-size', type=int, default=defaults.buffer_size)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    from audio_config import AudioConfig
+
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command == 'info':
+        print(json.dumps(CaptureReader(args.capture).summary(), indent=2))
+        return 0
+
+    if args.command == 'from-recording':
+        capture_from_recording(args.recording, args.capture,
+                               AudioConfig(sample_rate=args.sample_rate, buffer_size=args.buffer_size))
+        return 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        config = AudioConfig(ica_engine=args.ica_engine, window_size=args.window_size,
+                             hop_size=args.hop_size,
+                             scheduler_policy=args.scheduler_policy, queue_size=args.queue_size,
+                             recording_dir=args.recording_dir or directory, metrics_log_path="")
+        report = replay_headless(args.capture, config, args.speed, args.backpressure)
+
+    stats = report["stats"]
+    logging.info(f"{report['capture']['audio_seconds']:.1f} s de áudio em {report['elapsed']:.2f} s "
+                 f"({report['realtime_factor']:.1f}x o tempo real); "
+                 f"{stats['counters'].get('windows_processed', 0)} janelas processadas, "
+                 f"{stats['ring_buffer']['overruns']} blocos descartados, primeira janela separada em "
+                 f"{stats['gauges'].get('time_to_first_window_s', float('nan')) * 1000:.0f} ms")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        logging.info(f"Relatório gravado em {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,120 @@
+import threading
+
+import numpy as np
+
+
+def minmax_decimate(signal, n_bins, out):
+    """
+    Reduz um sinal a 2 * n_bins pontos preservando os picos (mínimo e máximo de cada bin).
+
+    :param signal: Sinal 1D; as amostras que não completam um bin são descartadas do início.
+    :param n_bins: Número de bins (tipicamente a largura do gráfico em pixels).
+    :param out: Array pré-alocado com pelo menos 2 * n_bins posições.
+    :return: (visão de out com os pontos decimados, tamanho de cada bin em amostras).
+    """
+    bin_size = len(signal) // n_bins
+    if bin_size <= 1:
+        out[:len(signal)] = signal
+        return out[:len(signal)], 1
+
+    usable = bin_size * n_bins
+    blocks = signal[len(signal) - usable:].reshape(n_bins, bin_size)
+    np.min(blocks, axis=1, out=out[0:2 * n_bins:2])
+    np.max(blocks, axis=1, out=out[1:2 * n_bins:2])
+    return out[:2 * n_bins], bin_size
+
+
+class DisplayBuffer:
+    """
+    Histórico rolante de um ou mais canais para exibição, atualizado no lugar.
+
+    O histórico é circular e espelhado (como no RingBuffer), então as últimas `history`
+    amostras estão sempre disponíveis como uma visão contígua, sem deslocar o array inteiro
+    a cada janela. Os pontos decimados também usam arrays pré-alocados.
+
+    append() é chamado pelo worker de processamento e decimated() pela interface; um lock
+    curto impede que a decimação leia um histórico escrito pela metade.
+    """
+
+    def __init__(self, history, channels, max_points=4096):
+        """
+        :param history: Número de amostras exibidas por canal.
+        :param channels: Número de canais (curvas).
+        :param max_points: Limite de bins da decimação (2 pontos por bin).
+        """
+        self.history = history
+        self.channels = channels
+        self.max_points = max_points
+        self._data = np.zeros((channels, 2 * history), dtype=np.float32)
+        self._position = 0
+        self._x = np.empty(2 * max_points, dtype=np.float64)
+        self._y = np.empty((channels, 2 * max_points), dtype=np.float32)
+        self._x_key = None
+        self._lock = threading.Lock()
+
+    def append(self, frames):
+        """Acrescenta frames (amostras, canais), descartando as amostras mais antigas"""
+        frames = frames[-self.history:]
+        n_frames = len(frames)
+        start = self._position
+        end = start + n_frames
+        block = frames.T[:self.channels]
+
+        with self._lock:
+            self._data[:, start:end] = block
+            if end <= self.history:
+                self._data[:, start + self.history:end + self.history] = block
+            else:
+                split = self.history - start
+                self._data[:, start + self.history:] = block[:, :split]
+                self._data[:, :end - self.history] = block[:, split:]
+            self._position = end % self.history
+
+    def view(self, channel):
+        """Visão contígua das últimas `history` amostras de um canal (mais antiga primeiro)"""
+        start = self._position
+        return self._data[channel, start:start + self.history]
+
+    def decimated(self, channel, width):
+        """
+        Pontos (x, y) decimados por mín-máx para a largura disponível em pixels.
+
+        :return: Visões dos arrays internos, válidas até a próxima chamada.
+        """
+        n_bins = max(1, min(int(width), self.max_points))
+        with self._lock:
+            y, bin_size = minmax_decimate(self.view(channel), n_bins, self._y[channel])
+
+        # O eixo x só muda quando a largura muda
+        if self._x_key != (len(y), bin_size):
+            offset = self.history - bin_size * (len(y) // 2) if bin_size > 1 else self.history - len(y)
+            if bin_size > 1:
+                self._x[:len(y)] = offset + np.repeat(np.arange(len(y) // 2) * bin_size + bin_size / 2, 2)
+            else:
+                self._x[:len(y)] = offset + np.arange(len(y))
+            self._x_key = (len(y), bin_size)
+        return self._x[:len(y)], y
+
+
+class DisplayHistory:
+    """
+    Históricos exibidos na interface (primeiro canal misturado e componentes separados).
+
+    Alimentado pelo worker com cada janela processada; como na gravação, após a primeira
+    janela só os últimos hop_size frames são novos e apenas eles entram no histórico, que
+    assim não repete a sobreposição nem depende de quais resultados a interface desenhou.
+    """
+
+    def __init__(self, config):
+        self.hop_size = config.hop_size or config.window_size
+        self.history_size = max(config.window_size, int(config.display_history_seconds * config.sample_rate))
+        self.mixed = DisplayBuffer(self.history_size, 1, config.display_max_points)
+        self.separated = DisplayBuffer(self.history_size, config.n_components, config.display_max_points)
+        self._started = False
+
+    def record(self, result):
+        """Acrescenta os frames novos de um ProcessingResult (chamado na thread do worker)"""
+        new_frames = slice(-self.hop_size, None) if self._started else slice(None)
+        self.mixed.append(result.mixed[new_frames, :1])
+        self.separated.append(result.separated[new_frames])
+        self._started = True
@@ -0,0 +1,122 @@
+import time
+from collections import deque
+
+import numpy as np
+
+from framing import Framer
+
+SCHEDULER_POLICIES = ("all", "latest", "deadline")
+
+
+class FrameScheduler:
+    """
+    Política de consumo do buffer circular pelo worker de processamento.
+
+    Antes de cada lote, decide quantas janelas pendentes descartar e quantas processar:
+
+    - "all": processa todas as janelas em ordem (comportamento original);
+    - "latest": pula direto para a janela mais recente;
+    - "deadline": descarta as janelas mais antigas apenas enquanto a latência prevista
+      (idade da janela + tempo estimado de processamento) passar de target_latency_ms.
+
+    Também acompanha o atraso (lag) em relação à entrada ao vivo, as janelas descartadas
+    e a tendência do acúmulo (backlog), estimada por regressão linear da ocupação do
+    buffer nos últimos scheduler_trend_seconds.
+    """
+
+    def __init__(self, config, stats=None, framer=None):
+        """
+        :param config: Configuração do sistema de áudio (scheduler_policy, target_latency_ms, ...).
+        :param stats: PipelineStats opcional que recebe contadores e medidores.
+        :param framer: Enquadramento usado pelo consumidor (padrão: Framer(config)).
+        """
+        if config.scheduler_policy not in SCHEDULER_POLICIES:
+            raise ValueError(f"Política de escalonamento desconhecida: {config.scheduler_policy} "
+                             f"(disponíveis: {', '.join(SCHEDULER_POLICIES)})")
+        self.policy = config.scheduler_policy
+        self.framer = framer if framer is not None else Framer(config)
+        self.sample_rate = config.sample_rate
+        self.target_latency = config.target_latency_ms / 1000
+        self.trend_seconds = config.scheduler_trend_seconds
+        self.stats = stats
+
+        self.skipped_windows = 0
+        self.lag = 0.0  # Idade (s) da janela escolhida no momento da retirada
+        self.processing_estimate = 0.0  # Média móvel exponencial do tempo de processamento (s)
+        self._backlog = deque()  # (instante, segundos de áudio pendentes)
+
+    def schedule(self, ring_buffer, now=None):
+        """
+        Descarta as janelas que a política manda pular e retorna quantas processar agora.
+
+        Deve ser chamado pelo consumidor antes do peek() do próximo lote.
+
+        :return: Número de janelas do próximo lote (0 se não houver uma janela completa).
+        """
+        now = time.perf_counter() if now is None else now
+        pending = self.framer.ready(ring_buffer)
+        self._record_backlog(now, ring_buffer.available() / self.sample_rate)
+        if pending == 0:
+            return 0
+
+        skip = 0
+        if self.policy == "latest":
+            skip = pending - 1
+        elif self.policy == "deadline":
+            # Pula enquanto a janela candidata não cumprir o prazo (a mais recente sempre fica)
+            while (skip < pending - 1
+                   and now - self.framer.capture_time(ring_buffer, skip) + self.processing_estimate
+                   > self.target_latency):
+                skip += 1
+
+        if skip:
+            self.framer.advance(ring_buffer, skip)
+            self.skipped_windows += skip
+            if self.stats is not None:
+                self.stats.increment("windows_skipped", skip)
+
+        self.lag = float(now - self.framer.capture_time(ring_buffer, 0))
+        if self.stats is not None:
+            self.stats.set_gauge("lag_ms", self.lag * 1000)
+        if self.policy == "latest":
+            return 1
+        return min(pending - skip, self.framer.max_batch)
+
+    def record_processing(self, seconds, smoothing=0.2):
+        """Atualiza a estimativa do tempo de processamento de uma janela (não do lote)"""
+        if self.processing_estimate == 0.0:
+            self.processing_estimate = seconds
+        else:
+            self.processing_estimate += smoothing * (seconds - self.processing_estimate)
+
+    def backlog_trend(self):
+        """Variação do acúmulo, em segundos de áudio por segundo (> 0: o atraso cresce)"""
+        if len(self._backlog) < 3:
+            return 0.0
+        times, backlog = np.array(self._backlog).T
+        if times[-1] - times[0] <= 0:
+            return 0.0
+        return float(np.polyfit(times - times[0], backlog, 1)[0])
+
+    def backlog_growing(self, threshold=0.05):
+        """True se o acúmulo cresce mais que `threshold` segundos de áudio por segundo"""
+        return self.backlog_trend() > threshold
+
+    def summary(self):
+        """Estado atual do escalonador (serializável em JSON)"""
+        return {
+            "policy": self.policy,
+            "lag_ms": self.lag * 1000,
+            "skipped_windows": self.skipped_windows,
+            "processing_estimate_ms": self.processing_estimate * 1000,
+            "backlog_seconds": self._backlog[-1][1] if self._backlog else 0.0,
+            "backlog_trend": self.backlog_trend(),
+            "backlog_growing": self.backlog_growing(),
+        }
+
+    def _record_backlog(self, now, backlog_seconds):
+        self._backlog.append((now, backlog_seconds))
+        while self._backlog and now - self._backlog[0][0] > self.trend_seconds:
+            self._backlog.popleft()
+        if self.stats is not None:
+            self.stats.set_gauge("backlog_seconds", backlog_seconds)
@@ -0,0 +1,67 @@
+import numpy as np
+
+
+def frame_windows(signal, window_size, hop_size):
+    """
+    Divide um sinal em janelas sobrepostas sem copiar dados.
+
+    :param signal: Array (frames, canais), por exemplo uma visão do buffer circular.
+    :param window_size: Frames por janela.
+    :param hop_size: Deslocamento entre o início de janelas consecutivas.
+    :return: Visão somente leitura (janelas, window_size, canais); vazia se o sinal for
+             menor que uma janela.
+    """
+    n_windows = max(0, (len(signal) - window_size) // hop_size + 1)
+    frame_stride, channel_stride = signal.strides
+    return np.lib.stride_tricks.as_strided(
+        signal, shape=(n_windows, window_size, signal.shape[1]),
+        strides=(frame_stride * hop_size, frame_stride, channel_stride),
+        writeable=False)
+
+
+class Framer:
+    """
+    Enquadramento contínuo do buffer circular em janelas de window_size frames a cada
+    hop_size frames, independente do tamanho de bloco do PortAudio.
+
+    Com hop_size < window_size as janelas se sobrepõem; com hop_size == window_size (ou
+    None, o padrão) todo frame capturado é analisado exatamente uma vez.
+    """
+
+    def __init__(self, config):
+        hop_size = config.hop_size or config.window_size
+        if not 0 < hop_size <= config.window_size:
+            raise ValueError("hop_size deve estar entre 1 e window_size")
+        self.window_size = config.window_size
+        self.hop_size = hop_size
+        self.max_batch = max(1, config.max_batch_windows)
+
+    def ready(self, ring_buffer):
+        """Número de janelas completas disponíveis no buffer"""
+        available = ring_buffer.available()
+        if available < self.window_size:
+            return 0
+        return (available - self.window_size) // self.hop_size + 1
+
+    def span(self, n_windows):
+        """Frames cobertos por n_windows janelas consecutivas"""
+        return self.window_size + (n_windows - 1) * self.hop_size
+
+    def peek(self, ring_buffer, n_windows):
+        """
+        Visão (n_windows, window_size, canais) das próximas janelas, sem cópia.
+
+        Válida até o próximo advance(); retorna None se não houver frames suficientes.
+        """
+        block = ring_buffer.peek(self.span(max(1, n_windows)))
+        if block is None:
+            return None
+        return frame_windows(block, self.window_size, self.hop_size)
+
+    def capture_time(self, ring_buffer, index):
+        """Instante de captura do último frame da janela `index`"""
+        return ring_buffer.timestamp(index * self.hop_size + self.window_size - 1)
+
+    def advance(self, ring_buffer, n_windows):
+        """Libera os frames que não fazem mais parte de nenhuma janela futura"""
+        ring_buffer.advance(n_windows * self.hop_size)
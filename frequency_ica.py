@@ -0,0 +1,209 @@
+import itertools
+import logging
+
+import numpy as np
+from whitening import whitening_matrix
+
+
+class FrequencyDomainICA:
+    """
+    ICA no domínio da frequência para misturas convolutivas.
+
+    Cada janela passa por uma STFT; em cada bin de frequência a mistura convolutiva vira
+    uma mistura instantânea complexa, separada pelo FastICA complexo (Bingham e Hyvärinen).
+    Todos os bins são processados juntos em arrays (bins, ...), sem laço Python por bin.
+    A escala de cada bin é fixada pela projeção de volta no primeiro canal, a permutação
+    é alinhada pelos envelopes de amplitude e pelas colunas da mistura estimada em cada
+    bin, e o sinal é reconstruído por overlap-add.
+
+    Uma janela de 2048 amostras rende poucas dezenas de quadros por bin, pouco para as
+    estatísticas de ordem superior do ICA complexo. Por isso o branqueamento, o ICA e o
+    alinhamento de permutações são estimados sobre um contexto com os últimos
+    context_frames quadros (janelas anteriores incluídas), e a separação resultante é
+    aplicada aos quadros da janela atual. A matriz de separação de cada bin é
+    reaproveitada como ponto de partida na janela seguinte, então poucas iterações bastam
+    em regime.
+    """
+
+    def __init__(self, n_components, fft_size=128, hop_size=64, max_iter=20, tol=1e-3, alpha=1.0,
+                 context_frames=344):
+        """
+        :param n_components: Número de fontes separadas.
+        :param fft_size: Tamanho da FFT (múltiplo de hop_size).
+        :param hop_size: Deslocamento entre quadros da STFT.
+        :param max_iter: Iterações máximas do FastICA complexo por janela.
+        :param tol: Tolerância de convergência (pior bin).
+        :param alpha: Constante da não linearidade G(u) = log(alpha + u); valores pequenos
+                      favorecem fontes esparsas e falham com fontes tonais (módulo constante no bin).
+        :param context_frames: Quadros da STFT acumulados para as estimativas (344 ≈ 0,5 s a
+                               44,1 kHz com hop 64); 0 usa só a janela atual.
+        """
+        if fft_size % hop_size:
+            raise ValueError("fft_size deve ser múltiplo de hop_size")
+        self.n_components = n_components
+        self.fft_size = fft_size
+        self.hop_size = hop_size
+        self.max_iter = max_iter
+        self.tol = tol
+        self.alpha = alpha
+        self.context_frames = context_frames
+        self.window = np.hanning(fft_size + 1)[:-1].astype(np.float32)  # Hann periódica
+        self.n_iter_ = 0
+        self._unmixing = None  # (bins, n_components, n_components), colunas w_i
+        self._context = None  # (bins, canais, quadros) mais recentes
+
+        # Permutações candidatas para o alinhamento entre bins
+        self._permutations = (np.array(list(itertools.permutations(range(n_components))))
+                              if n_components <= 6 else None)
+
+    def fit_transform(self, X):
+        """
+        Separa uma janela.
+
+        :param X: Array (amostras, canais).
+        :return: Array (amostras, n_components) em float32.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        n_samples = X.shape[0]
+        spectrum = self._stft(X)  # (bins, canais, quadros)
+        context = self._update_context(spectrum)
+
+        mean = context.mean(axis=2, keepdims=True)
+        whitened, whitening = self._whiten(context - mean)
+        unmixing = self._complex_fastica(whitened)
+        separation = unmixing.conj().transpose(0, 2, 1) @ whitening  # (bins, n, canais)
+        mixing = np.linalg.pinv(separation)  # (bins, canais, n)
+
+        # Permutações alinhadas pelos envelopes de todo o contexto
+        order = self._align_permutations(self._project_back(separation @ (context - mean), mixing), mixing)
+        sources = self._project_back(separation @ (spectrum - mean), mixing)
+        return self._istft(np.take_along_axis(sources, order[:, :, None], axis=1), n_samples)
+
+    def _update_context(self, spectrum):
+        """Acrescenta os quadros da janela ao contexto e descarta os mais antigos"""
+        if (self.context_frames <= spectrum.shape[2] or self._context is None
+                or self._context.shape[:2] != spectrum.shape[:2]):
+            self._context = spectrum
+        else:
+            self._context = np.concatenate((self._context, spectrum), axis=2)[:, :, -self.context_frames:]
+        return self._context
+
+    def _stft(self, X):
+        pad = self.fft_size
+        padded = np.pad(X, ((pad, pad + self.hop_size), (0, 0)))
+        n_frames = (len(padded) - self.fft_size) // self.hop_size + 1
+        frames = np.lib.stride_tricks.as_strided(
+            padded, shape=(n_frames, X.shape[1], self.fft_size),
+            strides=(padded.strides[0] * self.hop_size, padded.strides[1], padded.strides[0]),
+            writeable=False)
+        spectrum = np.fft.rfft(frames * self.window, axis=-1).astype(np.complex64)
+        return spectrum.transpose(2, 1, 0)
+
+    def _istft(self, sources, n_samples):
+        frames = np.fft.irfft(sources.transpose(2, 1, 0), n=self.fft_size, axis=-1).astype(np.float32)
+        frames *= self.window
+        n_frames, n_components = frames.shape[:2]
+        ratio = self.fft_size // self.hop_size
+
+        # Overlap-add por deslocamento de hop: um laço de fft_size/hop_size passos, não por quadro
+        segments = frames.reshape(n_frames, n_components, ratio, self.hop_size)
+        output = np.zeros((n_frames + ratio - 1, n_components, self.hop_size), dtype=np.float32)
+        norm = np.zeros((n_frames + ratio - 1, self.hop_size), dtype=np.float32)
+        window_squared = (self.window ** 2).reshape(ratio, self.hop_size)
+        for offset in range(ratio):
+            output[offset:offset + n_frames] += segments[:, :, offset]
+            norm[offset:offset + n_frames] += window_squared[offset]
+
+        signal = output.transpose(0, 2, 1).reshape(-1, n_components)
+        norm = norm.reshape(-1, 1)
+        pad = self.fft_size
+        signal = signal[pad:pad + n_samples] / np.maximum(norm[pad:pad + n_samples], 1e-8)
+        return signal
+
+    def _whiten(self, spectrum):
+        """Branqueia cada bin (já centralizado), reduzindo os canais a n_components (PCA)"""
+        n_frames = spectrum.shape[2]
+        covariance = spectrum @ spectrum.conj().transpose(0, 2, 1) / n_frames
+        whitening = whitening_matrix(covariance, self.n_components)
+        return whitening @ spectrum, whitening
+
+    def _complex_fastica(self, Z):
+        """FastICA complexo simétrico, vetorizado sobre todos os bins"""
+        n_bins, n_components, n_frames = Z.shape
+        if self._unmixing is None or self._unmixing.shape[0] != n_bins:
+            W = np.tile(np.eye(n_components, dtype=np.complex64), (n_bins, 1, 1))
+        else:
+            W = self._unmixing
+
+        for iteration in range(self.max_iter):
+            Y = W.conj().transpose(0, 2, 1) @ Z  # (bins, fontes, quadros)
+            power = Y.real ** 2 + Y.imag ** 2
+            g = 1.0 / (self.alpha + power)
+            dg = -g ** 2
+            W_new = (Z @ (Y.conj() * g).transpose(0, 2, 1) / n_frames
+                     - (g + power * dg).mean(axis=2)[:, None, :] * W)
+            W_new = self._symmetric_decorrelation(W_new)
+
+            change = np.max(np.abs(1 - np.abs(np.einsum('kci,kci->ki', W_new.conj(), W))))
+            W = W_new
+            if change < self.tol:
+                break
+
+        self.n_iter_ = iteration + 1
+        self._unmixing = W
+        return W
+
+    @staticmethod
+    def _symmetric_decorrelation(W):
+        """W (W^H W)^(-1/2), em lote"""
+        eigenvalues, eigenvectors = np.linalg.eigh(W.conj().transpose(0, 2, 1) @ W)
+        inverse_sqrt = (eigenvectors / np.sqrt(np.maximum(eigenvalues, 1e-12))[:, None, :]) \
+            @ eigenvectors.conj().transpose(0, 2, 1)
+        return W @ inverse_sqrt
+
+    @staticmethod
+    def _project_back(sources, mixing):
+        """Resolve a escala de cada bin projetando as fontes de volta no primeiro canal"""
+        return sources * mixing[:, 0, :, None]
+
+    def _align_permutations(self, sources, mixing, iterations=4):
+        """
+        Alinha a ordem das fontes entre bins: cada bin recebe a permutação cujos envelopes e
+        vetores de base (módulo das colunas da mistura, normalizado) mais se parecem com a
+        média (centróide) de cada fonte, refinada em algumas iterações. Os vetores de base
+        resolvem fontes tonais, de envelope quase constante.
+
+        :return: Ordem das fontes em cada bin, array (bins, n_components).
+        """
+        n_bins = sources.shape[0]
+        if self._permutations is None:
+            logging.warning("Alinhamento de permutações limitado a 6 componentes")
+            return np.tile(np.arange(self.n_components), (n_bins, 1))
+
+        envelopes = np.abs(sources)
+        envelopes = envelopes - envelopes.mean(axis=2, keepdims=True)
+        envelopes /= np.linalg.norm(envelopes, axis=2, keepdims=True) + 1e-12
+        basis = np.abs(mixing).transpose(0, 2, 1)  # (bins, fonte, canais)
+        basis /= np.linalg.norm(basis, axis=2, keepdims=True) + 1e-12
+        features = np.concatenate((envelopes, basis), axis=2)
+
+        columns = np.arange(self.n_components)
+        choice = np.zeros(n_bins, dtype=np.intp)
+        for _ in range(iterations):
+            aligned = np.take_along_axis(features, self._permutations[choice][:, :, None], axis=1)
+            centroid = aligned.mean(axis=0)
+            n_env = envelopes.shape[2]
+            centroid[:, :n_env] /= np.linalg.norm(centroid[:, :n_env], axis=1, keepdims=True) + 1e-12
+            centroid[:, n_env:] /= np.linalg.norm(centroid[:, n_env:], axis=1, keepdims=True) + 1e-12
+            correlation = features @ centroid.T  # (bins, fonte do bin, fonte do centróide)
+            scores = correlation[:, self._permutations, columns].sum(axis=2)  # (bins, permutações)
+            new_choice = np.argmax(scores, axis=1)
+            if np.array_equal(new_choice, choice):
+                break
+            choice = new_choice
+
+        order = self._permutations[choice]
+        if self._unmixing is not None:
+            # Mantém a ordem alinhada como ponto de partida da próxima janela
+            self._unmixing = np.take_along_axis(self._unmixing, order[:, None, :], axis=2)
+        return order
@@ -0,0 +1,192 @@
+import numpy as np
+
+from frequency_ica import FrequencyDomainICA
+from whitening import whitening_matrix
+
+
+class NumpyFastICA:
+    """
+    FastICA simétrico (não linearidade logcosh) em float32, sem a validação, as cópias
+    em float64 e a contabilidade de estimador do sklearn.
+
+    Mesmo contrato do FastICA do sklearn usado pelo SignalProcessor: fit_transform(X)
+    devolve (amostras, n_components) e os atributos components_, mixing_, mean_ e
+    whitening_ ficam disponíveis após o ajuste. Os arrays de trabalho são alocados uma
+    vez por formato de janela e reaproveitados; a matriz de separação da janela anterior
+    é o ponto de partida da seguinte, de modo que a iteração de ponto fixo costuma
+    parar cedo pela tolerância.
+    """
+
+    def __init__(self, n_components, max_iter=200, tol=0.01, random_state=42,
+                 whitening_interval=1, warm_start=True):
+        """
+        :param n_components: Número de fontes separadas.
+        :param max_iter: Iterações máximas da iteração de ponto fixo.
+        :param tol: Tolerância de convergência.
+        :param random_state: Semente da matriz inicial.
+        :param whitening_interval: Janelas entre recálculos do branqueamento (1 = toda janela).
+        :param warm_start: Parte da matriz de separação da janela anterior.
+        """
+        self.n_components = n_components
+        self.max_iter = max_iter
+        self.tol = tol
+        self.random_state = random_state
+        self.whitening_interval = max(1, whitening_interval)
+        self.warm_start = warm_start
+        self.w_init = None
+
+        self.components_ = None
+        self.mixing_ = None
+        self.mean_ = None
+        self.whitening_ = None
+        self.n_iter_ = 0
+
+        self._rotation = None  # (n_components, n_components), no espaço branqueado
+        self._windows_since_whitening = 0
+        self._shape = None
+
+    def set_params(self, **params):
+        """Atualiza parâmetros (como set_params do sklearn, usado para w_init)"""
+        for name, value in params.items():
+            if not hasattr(self, name):
+                raise ValueError(f"Parâmetro inválido para NumpyFastICA: {name}")
+            setattr(self, name, value)
+        return self
+
+    def fit_transform(self, X, out=None):
+        """
+        Ajusta e separa uma janela.
+
+        :param X: Array (amostras, canais).
+        :param out: Array (amostras, n_components) float32 opcional que recebe o resultado.
+        :return: Array (amostras, n_components) em float32.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        self._allocate(X.shape)
+
+        self.mean_ = X.mean(axis=0)
+        for channel in range(X.shape[1]):  # escalar por canal: sem buffers temporários do ufunc
+            np.subtract(X[:, channel], self.mean_[channel], out=self._centered[:, channel])
+
+        if self.whitening_ is None or self._windows_since_whitening >= self.whitening_interval:
+            self.whitening_ = self._whitening(self._centered)
+            self._windows_since_whitening = 0
+        self._windows_since_whitening += 1
+        np.matmul(self.whitening_, self._centered.T, out=self._whitened)
+
+        W = self._fixed_point(self._initial_rotation())
+        self._rotation = W
+        self.components_ = W @ self.whitening_
+        self.mixing_ = np.linalg.pinv(self.components_)
+        return np.matmul(self._centered, self.components_.T, out=out)
+
+    def _allocate(self, shape):
+        """Arrays de trabalho por formato de janela (realocados só quando o formato muda)"""
+        if shape == self._shape:
+            return
+        n_samples, n_channels = shape
+        self._centered = np.empty((n_samples, n_channels), dtype=np.float32)
+        self._whitened = np.empty((self.n_components, n_samples), dtype=np.float32)
+        self._projection = np.empty((self.n_components, n_samples), dtype=np.float32)
+        self._derivative = np.empty((self.n_components, n_samples), dtype=np.float32)
+        self._shape = shape
+        # O branqueamento e a rotação anteriores não valem para outro número de canais
+        self.whitening_ = None
+        self._rotation = None
+
+    def _whitening(self, centered):
+        """Matriz de branqueamento (n_components, canais) por eigh da covariância"""
+        covariance = centered.T @ centered / centered.shape[0]
+        return whitening_matrix(covariance, self.n_components).astype(np.float32)
+
+    def _initial_rotation(self):
+        if self.w_init is not None:
+            W = np.asarray(self.w_init, dtype=np.float32)
+        elif self.warm_start and self._rotation is not None:
+            W = self._rotation
+        else:
+            rng = np.random.default_rng(self.random_state)
+            W = rng.normal(size=(self.n_components, self.n_components)).astype(np.float32)
+        return self._symmetric_decorrelation(W)
+
+    def _fixed_point(self, W):
+        """Iteração de ponto fixo simétrica; para quando as linhas de W deixam de girar"""
+        Z = self._whitened
+        projection, derivative = self._projection, self._derivative
+        n_samples = Z.shape[1]
+
+        for iteration in range(self.max_iter):
+            np.matmul(W, Z, out=projection)
+            np.tanh(projection, out=projection)  # g(u) = tanh(u)
+            np.square(projection, out=derivative)
+            g_derivative = 1 - derivative.mean(axis=1)  # E[g'(u)] = E[1 - tanh²(u)]
+
+            W_new = projection @ Z.T / n_samples - g_derivative[:, np.newaxis] * W
+            W_new = self._symmetric_decorrelation(W_new)
+
+            change = np.max(np.abs(np.abs(np.einsum('ij,ij->i', W_new, W)) - 1))
+            W = W_new
+            if change < self.tol:
+                break
+
+        self.n_iter_ = iteration + 1
+        return W
+
+    @staticmethod
+    def _symmetric_decorrelation(W):
+        """W (W^T W)^(-1/2) aplicado pelas linhas: (W W^T)^(-1/2) W"""
+        eigenvalues, eigenvectors = np.linalg.eigh(W @ W.T)
+        eigenvalues = np.maximum(eigenvalues, 1e-12)
+        return ((eigenvectors / np.sqrt(eigenvalues)) @ eigenvectors.T @ W).astype(np.float32)
+
+
+def _sklearn_engine(config):
+    from sklearn.decomposition import FastICA  # ~1 s de importação: só quando o motor é usado
+
+    return FastICA(n_components=config.n_components,
+                   random_state=42,
+                   max_iter=config.ica_max_iter,
+                   tol=config.ica_tol,
+                   whiten_solver="eigh")
+
+
+def _numpy_engine(config):
+    return NumpyFastICA(config.n_components,
+                        max_iter=config.ica_max_iter,
+                        tol=config.ica_tol,
+                        whitening_interval=config.ica_whitening_interval)
+
+
+def _stft_engine(config):
+    # Misturas convolutivas: ICA complexo por bin da STFT
+    return FrequencyDomainICA(config.n_components,
+                              fft_size=config.stft_fft_size,
+                              hop_size=config.stft_hop_size,
+                              max_iter=config.stft_max_iter,
+                              context_frames=int(config.stft_context_seconds * config.sample_rate
+                                                 / config.stft_hop_size))
+
+
+# Motores de separação por nome (AudioConfig.ica_engine)
+ENGINES = {
+    "fastica": _sklearn_engine,
+    "numpy": _numpy_engine,
+    "stft": _stft_engine,
+}
+
+# Motores que expõem components_/mean_/whitening_ e aceitam w_init (modo incremental)
+INCREMENTAL_ENGINES = {"fastica", "numpy"}
+
+
+def create_engine(config):
+    """
+    Cria o motor de separação escolhido em config.ica_engine.
+
+    Todo motor oferece fit_transform(X) -> (amostras, n_components).
+    """
+    try:
+        factory = ENGINES[config.ica_engine]
+    except KeyError:
+        raise ValueError(f"Motor de ICA desconhecido: {config.ica_engine} "
+                         f"(disponíveis: {', '.join(ENGINES)})") from None
+    return factory(config)
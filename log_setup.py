@@ -0,0 +1,163 @@
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - [%(threadName)s] %(message)s'
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limita cada ponto de log (arquivo:linha) de nível até max_level a uma mensagem por intervalo.
+
+    Só as mensagens de rotina (DEBUG/INFO por padrão, as do caminho por janela) são
+    limitadas; WARNING e acima sempre passam. As repetições dentro do intervalo são
+    descartadas antes de qualquer formatação e apenas contadas; a próxima mensagem emitida
+    daquele ponto leva a contagem em `record.suppressed`, e `suppressed` acumula o total
+    descartado por ponto de log.
+    """
+
+    def __init__(self, interval=5.0, max_level=logging.INFO):
+        super().__init__()
+        self.interval = interval
+        self.max_level = max_level
+        self.suppressed = Counter()  # (arquivo, linha) -> total de repetições suprimidas
+        self._windows = {}  # (arquivo, linha) -> [início do intervalo, repetições suprimidas]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.interval <= 0 or record.levelno > self.max_level:
+            return True
+
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            window = self._windows.get(key)
+            if window is not None and record.created - window[0] < self.interval:
+                window[1] += 1
+                self.suppressed[key] += 1
+                return False
+
+            if window is not None and window[1]:
+                record.suppressed = window[1]
+                record.suppressed_span = record.created - window[0]
+            self._windows[key] = [record.created, 0]
+            return True
+
+    def pending(self):
+        """Repetições suprimidas ainda não relatadas, por ponto de log"""
+        with self._lock:
+            return {key: window[1] for key, window in self._windows.items() if window[1]}
+
+
+class AggregatingFormatter(logging.Formatter):
+    """Acrescenta à mensagem o número de repetições suprimidas pelo RateLimitFilter"""
+
+    def format(self, record):
+        message = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            message += f" (×{suppressed + 1} nos últimos {record.suppressed_span:.1f} s)"
+        return message
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que não formata o registro na thread de origem.
+
+    Como o listener roda no mesmo processo, o registro pode ir para a fila como está; a
+    formatação e a escrita em disco acontecem só na thread do QueueListener.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class LoggingPipeline:
+    """Logging assíncrono: fila em memória, filtro de taxa e uma thread escritora"""
+
+    def __init__(self, config):
+        self.config = config
+        self.queue = queue.SimpleQueue()
+        self.rate_limit = RateLimitFilter(self.config.log_rate_limit_interval,
+                                          logging.getLevelName(self.config.log_rate_limit_level))
+
+        formatter = AggregatingFormatter(LOG_FORMAT)
+        handlers = [logging.StreamHandler()]
+        if self.config.log_file:
+            Path(self.config.log_file).parent.mkdir(parents=True, exist_ok=True)
+            handlers.append(logging.FileHandler(self.config.log_file, mode='w'))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        self.queue_handler = DeferredQueueHandler(self.queue)
+        self.queue_handler.addFilter(self.rate_limit)
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+
+    def start(self):
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(self.queue_handler)
+        root.setLevel(self.config.log_level)
+        self.listener.start()
+        return self
+
+    def stop(self):
+        """Relata o total suprimido por ponto de log e esvazia a fila antes de encerrar"""
+        pending = self.rate_limit.pending()
+        for (path, line), count in self.rate_limit.suppressed.most_common():
+            # Vai direto para a fila, sem passar de novo pelo filtro de taxa
+            self.queue.put(logging.makeLogRecord({
+                'msg': f"{count} mensagens repetidas suprimidas em {Path(path).name}:{line} "
+                       f"({pending.get((path, line), 0)} desde a última emitida)",
+                'levelno': logging.INFO, 'levelname': 'INFO', 'threadName': threading.current_thread().name,
+            }))
+        self.listener.stop()
+        logging.getLogger().removeHandler(self.queue_handler)
+
+
+def setup_logging(config):
+    """Configura o logging não bloqueante da aplicação e retorna o pipeline já iniciado"""
+    return LoggingPipeline(config).start()
+
+
+class MetricsSink:
+    """
+    Destino estruturado para as métricas por janela (um objeto JSON por linha).
+
+    record() apenas enfileira uma tupla; a serialização e a escrita em disco ficam em uma
+    thread própria.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._write_loop, name="MetricsSink", daemon=True)
+        self._thread.start()
+
+    def record(self, sequence, metrics, capture_time=None):
+        self._queue.put((sequence, time.time(), capture_time, metrics))
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=2.0)
+
+    def _write_loop(self):
+        with open(self.path, 'w') as f:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                sequence, wall_time, capture_time, metrics = item
+                entry = {"seq": sequence, "time": round(wall_time, 4),
+                         **{name: float(value) for name, value in metrics.items()}}
+                if capture_time is not None:
+                    entry["capture_time"] = capture_time
+                f.write(json.dumps(entry, separators=(',', ':')) + "\n")
+                if self._queue.empty():
+                    f.flush()
@@ -1,51 +1,54 @@
 import logging
+import sys
 import threading
+import time
 from audio_config import AudioConfig
 from audio_device_manager import AudioDeviceManager
 from signal_processor import SignalProcessor
-from signal_visualizer import SignalVisualizer
 from audio_processor import AudioProcessor
-from PyQt5.QtWidgets import QApplication
-
-# Configuração do logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - [%(threadName)s] %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('ica_debug.log', mode='w')  # Logando em arquivo para debug
-    ]
-)
+from log_setup import setup_logging
 
 
 def main():
-    try:
-        # Inicializando a configuração do sistema de áudio
-        config = AudioConfig()
+    # Referência do tempo até a primeira janela separada
+    start_time = time.perf_counter()
+
+    # Inicializando a configuração do sistema de áudio
+    config = AudioConfig()
+
+    # Logging assíncrono: formatação e escrita em disco fora das threads de áudio e da interface
+    logging_pipeline = setup_logging(config)
 
+    audio_processor = None
+    audio_processor_thread = None
+    try:
         # Inicializando o gerenciador de dispositivos de áudio
         device_manager = AudioDeviceManager(config)
 
-        # Inicializando o processador de sinais (ex: FastICA)
+        # Inicializando o processador de sinais (ex: FastICA); o motor de ICA (e a importação
+        # do sklearn) é criado pelo worker de processamento, fora da thread principal
         signal_processor = SignalProcessor(config)
 
-        # Inicializando o visualizador de sinais com PyQtGraph
-        app = QApplication([])  # QApplication precisa estar na thread principal
-        visualizer = SignalVisualizer(config)
-
-        # Inicializando o processador geral que conecta tudo
-        audio_processor = AudioProcessor(config, device_manager, signal_processor, visualizer)
+        # Inicializando o processador geral que conecta tudo; o visualizador é ligado depois
+        audio_processor = AudioProcessor(config, device_manager, signal_processor, None, start_time)
 
         logging.info("Iniciando processamento de áudio...")
 
-        # Iniciando a thread de processamento de áudio
-        audio_processor_thread = threading.Thread(target=audio_processor.start)
+        # Dispositivo e stream sobem em paralelo à importação do Qt/PyQtGraph e à criação da janela
+        audio_processor_thread = threading.Thread(target=audio_processor.start, name="AudioStart")
         audio_processor_thread.start()
 
-        # Iniciando a interface PyQtGraph e o loop de atualização de gráficos na thread principal
-        visualizer.start_update_loop(audio_processor.update_plot)  # Corrigido
+        # Interface na thread principal, com uma única QApplication
+        from PyQt5.QtWidgets import QApplication
+        from signal_visualizer import SignalVisualizer
+
+        app = QApplication.instance() or QApplication(sys.argv)
+        audio_processor.visualizer = SignalVisualizer(config, audio_processor.display)
+        audio_processor.stats.set_gauge("startup_ui_s", time.perf_counter() - start_time)
+        logging.info(f"Interface pronta {(time.perf_counter() - start_time) * 1000:.0f} ms após o início")
 
-        # Executando a interface gráfica (PyQt) na thread principal
+        # Loop de atualização de gráficos e loop de eventos na thread principal
+        audio_processor.visualizer.start_update_loop(audio_processor.update_plot)
         app.exec_()
 
     except KeyboardInterrupt:
@@ -53,7 +56,12 @@ def main():
     except Exception as e:
         logging.error(f"Erro fatal: {e}", exc_info=True)
     finally:
+        if audio_processor_thread is not None:
+            audio_processor_thread.join(timeout=5.0)
+        if audio_processor is not None and audio_processor.running:
+            audio_processor._cleanup()
         logging.info("Programa finalizado.")
+        logging_pipeline.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,195 @@
+import cProfile
+import io
+import json
+import logging
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import numpy as np
+
+# Etapas medidas, na ordem do fluxo captura → ICA → renderização
+STAGES = ("capture_to_dequeue", "normalize", "ica", "metrics", "render", "end_to_end")
+
+
+class RollingHistogram:
+    """Últimos N valores de uma grandeza em array pré-alocado, com percentis sob demanda"""
+
+    def __init__(self, size=1024):
+        self._values = np.zeros(size)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def record(self, value):
+        with self._lock:
+            self._values[self._count % len(self._values)] = value
+            self._count += 1
+
+    def summary(self):
+        with self._lock:
+            values = self._values[:min(self._count, len(self._values))].copy()
+            count = self._count
+        if count == 0:
+            return {"count": 0}
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return {"count": count, "mean": float(values.mean()), "p50": float(p50),
+                "p95": float(p95), "p99": float(p99), "max": float(values.max())}
+
+
+class PipelineStats:
+    """
+    Instrumentação do pipeline: latência por etapa (ms), contadores e medidores.
+
+    Cada histograma é alimentado por uma única thread; snapshot() pode ser chamado de
+    qualquer thread e retorna um dicionário serializável em JSON.
+    """
+
+    def __init__(self, window=1024):
+        self.window = window
+        self.latencies = {stage: RollingHistogram(window) for stage in STAGES}
+        self.distributions = {}
+        self.counters = Counter()
+        self.gauges = {}
+        self.started_at = time.perf_counter()
+        self._dump_thread = None
+        self._dump_stop = threading.Event()
+
+    def record_latency(self, stage, seconds):
+        """Registra a duração de uma etapa em segundos (armazenada em ms)"""
+        histogram = self.latencies.get(stage)
+        if histogram is None:
+            histogram = self.latencies.setdefault(stage, RollingHistogram(self.window))
+        histogram.record(seconds * 1000)
+
+    @contextmanager
+    def time_stage(self, stage):
+        """Mede o bloco de código como uma etapa do pipeline"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_latency(stage, time.perf_counter() - start)
+
+    def record_value(self, name, value):
+        """Registra um valor em uma distribuição rolante (ex.: profundidade da fila)"""
+        histogram = self.distributions.get(name)
+        if histogram is None:
+            histogram = self.distributions.setdefault(name, RollingHistogram(self.window))
+        histogram.record(value)
+
+    def increment(self, counter, amount=1):
+        self.counters[counter] += amount
+
+    def set_gauge(self, name, value):
+        self.gauges[name] = value
+
+    def snapshot(self):
+        """Estado atual de todas as métricas"""
+        return {
+            "uptime": time.perf_counter() - self.started_at,
+            "latency_ms": {stage: histogram.summary() for stage, histogram in list(self.latencies.items())},
+            "distributions": {name: histogram.summary() for name, histogram in list(self.distributions.items())},
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+        }
+
+    def start_periodic_dump(self, interval, path=None):
+        """
+        Registra o snapshot no log a cada `interval` segundos e, opcionalmente, o grava em
+        `path` (um objeto JSON por linha).
+        """
+        if self._dump_thread is not None or interval <= 0:
+            return
+
+        def dump_loop():
+            while not self._dump_stop.wait(interval):
+                self.dump(path)
+
+        self._dump_thread = threading.Thread(target=dump_loop, name="StatsDump", daemon=True)
+        self._dump_thread.start()
+
+    def stop_periodic_dump(self):
+        self._dump_stop.set()
+        if self._dump_thread is not None:
+            self._dump_thread.join(timeout=1.0)
+            self._dump_thread = None
+
+    def dump(self, path=None):
+        snapshot = json.dumps(self.snapshot())
+        logging.info(f"Estatísticas do pipeline: {snapshot}")
+        if path:
+            with open(path, 'a') as f:
+                f.write(snapshot + "\n")
+
+
+class SamplingProfiler:
+    """
+    Profiler por amostragem de uma thread: registra a pilha da thread alvo a intervalos
+    fixos, com custo desprezível para a thread medida.
+
+    Expõe enable()/disable() como o cProfile.Profile, para ser usado no mesmo ponto.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = Counter()
+        self._target = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def enable(self):
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="SamplingProfiler", daemon=True)
+        self._thread.start()
+
+    def disable(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_filename}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def dump_stats(self, path):
+        """Grava as pilhas no formato "collapsed" (compatível com flamegraph.pl / speedscope)"""
+        with open(path, 'w') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def create_profiler(mode):
+    """
+    Cria o profiler opcional da etapa de processamento.
+
+    :param mode: "" (desligado), "cprofile" ou "sampling".
+    """
+    if not mode:
+        return None
+    if mode == "cprofile":
+        return cProfile.Profile()
+    if mode == "sampling":
+        return SamplingProfiler()
+    raise ValueError(f"Profiler desconhecido: {mode}")
+
+
+def report_profile(profiler, path):
+    """Grava o resultado do profiler e registra um resumo no log"""
+    profiler.dump_stats(path)
+    if isinstance(profiler, cProfile.Profile):
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(15)
+        logging.info(f"Perfil da etapa de processamento gravado em {path}:\n{output.getvalue()}")
+    else:
+        logging.info(f"Perfil por amostragem ({sum(profiler.samples.values())} amostras) gravado em {path}")
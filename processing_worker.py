@@ -0,0 +1,130 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from frame_scheduler import FrameScheduler
+from framing import Framer
+from pipeline_stats import create_profiler, report_profile
+from signal_pipeline import SignalPipeline
+
+
+@dataclass(frozen=True)
+class PublishedResult:
+    """Campos de um ProcessingResult lidos pela interface, sem os buffers do pool"""
+    sequence: int
+    metrics: dict
+    capture_time: float = None
+
+
+class ProcessingWorker(threading.Thread):
+    """
+    Thread dedicada que consome o buffer circular e executa o SignalPipeline.
+
+    O buffer é lido em janelas de window_size frames a cada hop_size frames (Framer),
+    independentes dos blocos do PortAudio; quando várias janelas estão prontas, elas são
+    normalizadas em lote a partir de visões sem cópia do buffer.
+
+    Os ProcessingResult apontam para buffers em rodízio do pipeline, consumidos só nesta
+    thread (on_result alimenta o histórico de exibição e a gravação). A interface recebe
+    apenas sequência, métricas e instante de captura (PublishedResult), publicados por
+    simples troca de referência (atômica sob o GIL), sem cópia de janelas e sem nunca
+    esperar pelo ICA. Quando o ICA não acompanha a captura, o FrameScheduler decide quais
+    blocos pendentes descartar.
+    """
+
+    def __init__(self, config, ring_buffer, pipeline: SignalPipeline, on_result=None):
+        """
+        :param config: Configuração do sistema de áudio.
+        :param ring_buffer: Buffer circular preenchido pelo callback de áudio.
+        :param pipeline: Etapa de normalização, ICA e métricas.
+        :param on_result: Função opcional chamada (nesta thread) com cada ProcessingResult.
+        """
+        super().__init__(name="ProcessingWorker", daemon=True)
+        self.config = config
+        self.ring_buffer = ring_buffer
+        self.pipeline = pipeline
+        self.on_result = on_result
+        self.poll_interval = self.config.buffer_size / self.config.sample_rate / 4
+        self.processed_count = 0
+        self.stats = pipeline.stats
+        self.framer = Framer(config)
+        self.scheduler = FrameScheduler(config, self.stats, self.framer)
+        self.profiler = create_profiler(self.config.profile_processing)
+        self._latest = None
+        self._stop_event = threading.Event()
+
+    def latest_result(self):
+        """Último PublishedResult (ou None)"""
+        return self._latest
+
+    def stop(self, timeout=None):
+        """Sinaliza o término da thread e aguarda a janela em andamento"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def run(self):
+        logging.info("Worker de processamento iniciado.")
+        # O motor de ICA é criado aqui, enquanto o stream preenche a primeira janela
+        setup_start = time.perf_counter()
+        try:
+            self.pipeline.signal_processor.prepare()
+        except Exception as e:
+            logging.error(f"Erro ao criar o motor de ICA: {e}", exc_info=True)
+            return
+        self.stats.set_gauge("startup_engine_s", time.perf_counter() - setup_start)
+        if self.profiler is not None:
+            self.profiler.enable()
+        try:
+            self._run_loop()
+        finally:
+            if self.profiler is not None:
+                self.profiler.disable()
+                report_profile(self.profiler, self.config.profile_output)
+        logging.info("Worker de processamento finalizado.")
+
+    def _run_loop(self):
+        while not self._stop_event.is_set():
+            try:
+                self.stats.record_value("queue_depth_frames", self.ring_buffer.available())
+                self.stats.set_gauge("ring_overruns", self.ring_buffer.overruns)
+                self.stats.set_gauge("ring_underruns", self.ring_buffer.underruns)
+
+                # Sem janela completa não há leitura: underruns contam só leituras que falharam
+                n_windows = self.scheduler.schedule(self.ring_buffer)
+                windows = self.framer.peek(self.ring_buffer, n_windows) if n_windows else None
+                if windows is None:
+                    self._stop_event.wait(self.poll_interval)
+                    continue
+
+                # Latência entre a captura do último frame de cada janela e sua retirada do buffer
+                dequeued_at = time.perf_counter()
+                capture_times = [self.framer.capture_time(self.ring_buffer, index) for index in range(n_windows)]
+                for capture_time in capture_times:
+                    self.stats.record_latency("capture_to_dequeue", dequeued_at - capture_time)
+
+                # normalize_windows copia as janelas, liberando os frames para o produtor
+                batch, active = self.pipeline.normalize_windows(windows)
+                self.framer.advance(self.ring_buffer, n_windows)
+                if n_windows > 1:
+                    self.stats.record_value("batch_windows", n_windows)
+
+                for data, is_active, capture_time in zip(batch, active, capture_times):
+                    if not is_active:
+                        self.stats.increment("windows_silent")
+                        continue
+                    self._process_window(data, capture_time)
+                self.stats.set_gauge("backlog_trend", self.scheduler.backlog_trend())
+            except Exception as e:
+                logging.error(f"Erro no worker de processamento: {e}", exc_info=True)
+
+    def _process_window(self, data, capture_time):
+        start_time = time.perf_counter()
+        result = self.pipeline.process(data, capture_time)
+        self.scheduler.record_processing(time.perf_counter() - start_time)
+        if result is not None:
+            self._latest = PublishedResult(result.sequence, result.metrics, result.capture_time)
+            self.processed_count += 1
+            if self.on_result is not None:
+                self.on_result(result)
@@ -0,0 +1,176 @@
+import time
+
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Buffer circular pré-alocado para um único produtor e um único consumidor.
+
+    O produtor (callback do PortAudio) copia cada bloco para um array NumPy fixo, sem
+    alocação nem lock; o consumidor lê visões (views) contíguas desse mesmo array. Para que
+    toda leitura seja contígua, o armazenamento tem o dobro da capacidade e cada escrita é
+    espelhada na outra metade.
+
+    Cada frame carrega o instante (time.perf_counter) em que seu bloco foi escrito, o que
+    permite medir a latência desde a captura.
+
+    Os índices de escrita e leitura são contadores monotônicos: cada um é alterado por uma
+    única thread e só depois que os dados correspondentes já foram copiados.
+    """
+
+    def __init__(self, capacity, channels, dtype=np.float32):
+        """
+        :param capacity: Capacidade em frames.
+        :param channels: Número de canais por frame.
+        :param dtype: Tipo das amostras armazenadas.
+        """
+        self.capacity = capacity
+        self.channels = channels
+        self._data = np.zeros((2 * capacity, channels), dtype=dtype)
+        self._timestamps = np.zeros(2 * capacity)
+        self._write_index = 0
+        self._read_index = 0
+        self.overruns = 0  # Blocos descartados por falta de espaço
+        self.underruns = 0  # Leituras sem frames suficientes disponíveis
+
+    def available(self):
+        """Número de frames prontos para leitura"""
+        return self._write_index - self._read_index
+
+    def free(self):
+        """Número de frames que ainda podem ser escritos"""
+        return self.capacity - self.available()
+
+    def write(self, block, timestamp=None):
+        """
+        Copia um bloco para o buffer (lado do produtor).
+
+        :param block: Array (frames, channels).
+        :param timestamp: Instante de captura do bloco (padrão: time.perf_counter()).
+        :return: False se o bloco foi descartado por falta de espaço.
+        """
+        n_frames = len(block)
+        if n_frames > self.free():
+            self.overruns += 1
+            return False
+
+        if timestamp is None:
+            timestamp = time.perf_counter()
+
+        start = self._write_index % self.capacity
+        end = start + n_frames
+        self._data[start:end] = block
+        self._timestamps[start:end] = timestamp
+
+        # Espelhamento: mantém _data[i] == _data[i + capacity]
+        if end <= self.capacity:
+            self._data[start + self.capacity:end + self.capacity] = block
+            self._timestamps[start + self.capacity:end + self.capacity] = timestamp
+        else:
+            split = self.capacity - start
+            self._data[start + self.capacity:] = block[:split]
+            self._data[:end - self.capacity] = block[split:]
+            self._timestamps[start + self.capacity:] = timestamp
+            self._timestamps[:end - self.capacity] = timestamp
+
+        self._write_index += n_frames
+        return True
+
+    def peek(self, n_frames):
+        """
+        Retorna uma visão (sem cópia) dos próximos frames, sem consumi-los (lado do consumidor).
+
+        A visão só é válida até a próxima chamada de advance().
+
+        :param n_frames: Número de frames desejados.
+        :return: Array (n_frames, channels) ou None se não houver frames suficientes.
+        """
+        if n_frames > self.available():
+            self.underruns += 1
+            return None
+
+        start = self._read_index % self.capacity
+        return self._data[start:start + n_frames]
+
+    def timestamp(self, offset=0):
+        """Instante de captura do frame `offset` posições após o início da leitura"""
+        return self._timestamps[(self._read_index + offset) % self.capacity]
+
+    def advance(self, n_frames):
+        """Libera frames já lidos para o produtor"""
+        self._read_index += min(n_frames, self.available())
+
+    def stats(self):
+        """Contadores de ocupação e perdas do buffer"""
+        return {
+            "available": self.available(),
+            "capacity": self.capacity,
+            "overruns": self.overruns,
+            "underruns": self.underruns,
+        }
+
+
+class SharedRingBuffer(RingBuffer):
+    """
+    RingBuffer em multiprocessing.shared_memory, para produtor e consumidor em processos
+    diferentes.
+
+    Dados, instantes de captura, índices e contadores ficam no mesmo segmento; o outro
+    processo se conecta com SharedRingBuffer.attach(buffer.descriptor()). A ordem de
+    publicação (dados antes do índice) é a mesma do RingBuffer.
+    """
+
+    _STATE_FIELDS = 4  # write_index, read_index, overruns, underruns
+    _STATE_BYTES = _STATE_FIELDS * 8
+
+    def __init__(self, capacity, channels, dtype=np.float32, name=None, create=True):
+        """
+        :param name: Nome do segmento (None gera um nome novo ao criar).
+        :param create: True cria o segmento; False conecta-se a um existente.
+        """
+        from multiprocessing import shared_memory
+
+        dtype = np.dtype(dtype)
+        timestamp_bytes = 2 * capacity * 8
+        data_bytes = 2 * capacity * channels * dtype.itemsize
+        self._shm = shared_memory.SharedMemory(name=name, create=create,
+                                               size=self._STATE_BYTES + timestamp_bytes + data_bytes)
+        self._owner = create
+        self.capacity = capacity
+        self.channels = channels
+        self.dtype = dtype
+        self._state = np.ndarray(self._STATE_FIELDS, dtype=np.int64, buffer=self._shm.buf)
+        self._timestamps = np.ndarray(2 * capacity, dtype=np.float64, buffer=self._shm.buf,
+                                      offset=self._STATE_BYTES)
+        self._data = np.ndarray((2 * capacity, channels), dtype=dtype, buffer=self._shm.buf,
+                                offset=self._STATE_BYTES + timestamp_bytes)
+        if create:
+            self._state[:] = 0
+
+    @classmethod
+    def attach(cls, descriptor):
+        """Conecta-se a um buffer criado em outro processo"""
+        name, capacity, channels, dtype = descriptor
+        return cls(capacity, channels, dtype, name=name, create=False)
+
+    def descriptor(self):
+        """Informações (serializáveis) para attach() em outro processo"""
+        return self._shm.name, self.capacity, self.channels, self.dtype.str
+
+    def close(self):
+        """Libera as visões e desconecta o segmento; o criador também o remove"""
+        self._state = self._timestamps = self._data = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def _field(index):
+        return property(lambda self: int(self._state[index]),
+                        lambda self, value: self._state.__setitem__(index, value))
+
+    _write_index = _field(0)
+    _read_index = _field(1)
+    overruns = _field(2)
+    underruns = _field(3)
+    del _field
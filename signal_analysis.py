@@ -1,6 +1,6 @@
 import numpy as np
-from scipy.spatial.distance import cosine, correlation
-from scipy.stats import entropy
+
+METRIC_NAMES = ("Euclidean", "Cross Correlation", "Pearson", "MSE", "Cosine", "Cross Entropy")
 
 
 class SignalAnalysis:
@@ -14,6 +14,8 @@ class SignalAnalysis:
 
     @staticmethod
     def pearson_distance(signal1, signal2):
+        from scipy.spatial.distance import correlation  # SciPy só nas métricas de referência
+
         return correlation(signal1, signal2)
 
     @staticmethod
@@ -22,10 +24,169 @@ class SignalAnalysis:
 
     @staticmethod
     def cosine_distance(signal1, signal2):
+        from scipy.spatial.distance import cosine
+
         return cosine(signal1, signal2)
 
     @staticmethod
     def cross_entropy(signal1, signal2, bins=30):
+        from scipy.stats import entropy
+
         hist1, _ = np.histogram(signal1, bins=bins, density=True)
         hist2, _ = np.histogram(signal2, bins=bins, density=True)
         return entropy(hist1, hist2)
+
+    @staticmethod
+    def pairwise_metrics(signals, bins=30, workspace=None):
+        """
+        Calcula todas as métricas para todos os pares de componentes em uma única passada.
+
+        Produtos internos, normas e médias saem de uma só matriz de Gram; os histogramas de
+        todas as colunas são montados com um único bincount. A janela não é convertida para
+        float64: só as estatísticas (componentes x componentes) são.
+
+        :param signals: Array (amostras, componentes).
+        :param bins: Número de bins dos histogramas da entropia cruzada.
+        :param workspace: MetricsWorkspace opcional, reaproveitado entre janelas.
+        :return: Dicionário nome da métrica -> matriz (componentes, componentes).
+        """
+        signals = np.asarray(signals)
+        n_samples, n_components = signals.shape
+        workspace = workspace if workspace is not None else MetricsWorkspace()
+
+        # Histograma de cada coluna no seu próprio intervalo, como np.histogram
+        minimum = signals.min(axis=0).astype(np.float64)
+        span = signals.max(axis=0) - minimum
+        span[span == 0] = 1.0
+        indices = workspace.bin_indices(signals, minimum, bins / span, bins)
+        histograms = np.bincount(indices.ravel(), minlength=n_components * bins).reshape(n_components, bins)
+
+        return SignalAnalysis.metrics_from_statistics(n_samples, signals.sum(axis=0).astype(np.float64),
+                                                      (signals.T @ signals).astype(np.float64), histograms)
+
+    @staticmethod
+    def metrics_from_statistics(n_samples, sums, gram, histograms):
+        """
+        Deriva as seis métricas a partir das estatísticas suficientes.
+
+        :param n_samples: Número de amostras acumuladas.
+        :param sums: Soma de cada componente, shape (componentes,).
+        :param gram: Matriz de Gram X^T X, shape (componentes, componentes).
+        :param histograms: Contagens por bin, shape (componentes, bins).
+        :return: Dicionário nome da métrica -> matriz (componentes, componentes).
+        """
+        squared_norms = np.diag(gram)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            squared_distance = np.maximum(squared_norms[:, None] + squared_norms[None, :] - 2 * gram, 0)
+            np.fill_diagonal(squared_distance, 0)
+
+            centered = gram - np.outer(sums, sums) / n_samples
+            centered_norms = np.sqrt(np.diag(centered))
+            correlation_matrix = centered / np.outer(centered_norms, centered_norms)
+
+            norms = np.sqrt(squared_norms)
+            cosine_similarity = gram / np.outer(norms, norms)
+
+            # Divergência KL entre as distribuições normalizadas (equivale a scipy.stats.entropy)
+            probabilities = histograms / histograms.sum(axis=1, keepdims=True)
+            log_probabilities = np.log(probabilities)
+            p = probabilities[:, None, :]
+            terms = np.where(p > 0, p * (log_probabilities[:, None, :] - log_probabilities[None, :, :]), 0)
+            cross_entropy = terms.sum(axis=2)
+
+        return {
+            "Euclidean": np.sqrt(squared_distance),
+            "Cross Correlation": correlation_matrix,
+            "Pearson": 1 - correlation_matrix,
+            "MSE": squared_distance / n_samples,
+            "Cosine": 1 - cosine_similarity,
+            "Cross Entropy": cross_entropy,
+        }
+
+    @staticmethod
+    def summarize(matrices):
+        """
+        Converte as matrizes de métricas em valores escalares por par para exibição.
+
+        Com dois componentes as chaves são apenas os nomes das métricas; com mais, cada par
+        recebe o sufixo "i-j" (componentes numerados a partir de 1).
+        """
+        n_components = next(iter(matrices.values())).shape[0]
+        pairs = [(i, j) for i in range(n_components) for j in range(i + 1, n_components)]
+        if len(pairs) == 1:
+            return {name: matrices[name][0, 1] for name in METRIC_NAMES}
+        return {f"{name} {i + 1}-{j + 1}": matrices[name][i, j] for name in METRIC_NAMES for i, j in pairs}
+
+
+class MetricsWorkspace:
+    """Arrays de trabalho dos histogramas, reaproveitados entre janelas do mesmo formato"""
+
+    def __init__(self):
+        self._scaled = None
+        self._indices = None
+        self._offsets = None
+        self._bins = None
+
+    def bin_indices(self, signals, low, scale, bins):
+        """
+        Índice do bin de cada amostra, deslocado por coluna para um único bincount.
+
+        Valores fora de [low, low + bins / scale) vão para o primeiro ou o último bin.
+
+        :return: Array (amostras, componentes) de índices; válido até a próxima chamada.
+        """
+        if self._scaled is None or self._scaled.shape != signals.shape or self._bins != bins:
+            self._scaled = np.empty(signals.shape, dtype=np.float32)
+            self._indices = np.empty(signals.shape, dtype=np.intp)
+            self._offsets = np.arange(signals.shape[1]) * bins
+            self._bins = bins
+        # Coluna a coluna e com escalares float32: o broadcasting por linha e a mistura com
+        # float64 fariam o ufunc alocar buffers temporários a cada chamada
+        low = np.broadcast_to(np.asarray(low, dtype=np.float32), signals.shape[1:])
+        scale = np.broadcast_to(np.asarray(scale, dtype=np.float32), signals.shape[1:])
+        for column in range(signals.shape[1]):
+            scaled = self._scaled[:, column]
+            np.subtract(signals[:, column], low[column], out=scaled, casting="same_kind")
+            scaled *= scale[column]
+        np.maximum(self._scaled, np.float32(0), out=self._scaled)
+        np.minimum(self._scaled, np.float32(bins - 1), out=self._scaled)
+        np.copyto(self._indices, self._scaled, casting="unsafe")  # trunca, como astype(intp)
+        for column in range(signals.shape[1]):
+            self._indices[:, column] += self._offsets[column]
+        return self._indices
+
+
+class StreamingMetrics:
+    """
+    Métricas acumuladas janela a janela, sem reprocessar as janelas anteriores.
+
+    Mantém apenas as estatísticas suficientes (contagem, somas, matriz de Gram e histogramas
+    com intervalo fixo). Com decay < 1 as janelas antigas perdem peso exponencialmente.
+    """
+
+    def __init__(self, n_components, bins=30, hist_range=(-5.0, 5.0), decay=1.0):
+        self.n_components = n_components
+        self.bins = bins
+        self.hist_range = hist_range
+        self.decay = decay
+        self.n_samples = 0.0
+        self.sums = np.zeros(n_components)
+        self.gram = np.zeros((n_components, n_components))
+        self.histograms = np.zeros((n_components, bins))
+        self._workspace = MetricsWorkspace()
+
+    def update(self, signals):
+        """Acumula uma janela (amostras, componentes)"""
+        signals = np.asarray(signals)
+        low, high = self.hist_range
+        indices = self._workspace.bin_indices(signals, low, self.bins / (high - low), self.bins)
+        counts = np.bincount(indices.ravel(), minlength=self.n_components * self.bins)
+
+        self.n_samples = self.decay * self.n_samples + signals.shape[0]
+        self.sums = self.decay * self.sums + signals.sum(axis=0)
+        self.gram = self.decay * self.gram + signals.T @ signals
+        self.histograms = self.decay * self.histograms + counts.reshape(self.n_components, self.bins)
+
+    def metrics(self):
+        """Matrizes de métricas sobre todas as janelas acumuladas"""
+        return SignalAnalysis.metrics_from_statistics(self.n_samples, self.sums, self.gram, self.histograms)
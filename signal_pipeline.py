@@ -0,0 +1,194 @@
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+from activity_gate import ActivityGate
+from pipeline_stats import PipelineStats
+from signal_analysis import MetricsWorkspace, SignalAnalysis, StreamingMetrics
+
+# Desvio padrão mínimo de um canal, relativo ao pico da janela, para ser normalizado
+_MIN_RELATIVE_DEVIATION = 1e-6
+
+
+@dataclass
+class ProcessingResult:
+    sequence: int
+    mixed: np.ndarray
+    separated: np.ndarray
+    metrics: dict
+    metric_matrices: dict
+    capture_time: float = None  # time.perf_counter() da captura do último frame da janela
+
+
+class BufferPool:
+    """
+    Buffers float32 de janelas reaproveitados em rodízio.
+
+    Um buffer entregue por take() é reescrito depois de no máximo `size` outras janelas
+    (menos, quando um lote não cabe no fim do pool); o histórico de exibição e a gravação
+    o consomem antes disso, na thread do worker, e a interface não lê esses buffers.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._buffers = None
+        self._next = 0
+
+    def take(self, n, shape):
+        """n buffers consecutivos, como uma única visão (n, *shape)"""
+        if self._buffers is None or self._buffers.shape[1:] != tuple(shape):
+            self._buffers = np.empty((self.size, *shape), dtype=np.float32)
+            self._next = 0
+        if n > self.size:
+            return np.empty((n, *shape), dtype=np.float32)
+        if self._next + n > self.size:
+            self._next = 0
+        buffers = self._buffers[self._next:self._next + n]
+        self._next += n
+        return buffers
+
+
+class SignalPipeline:
+    """
+    Etapa de processamento independente da interface: normalização, ICA e métricas.
+
+    O caminho é todo em float32 e sem alocações do tamanho da janela em regime: as janelas
+    normalizadas e os sinais separados vivem em BufferPools, e os ProcessingResult apontam
+    para esses buffers sem cópia (válidos por result_pool_size janelas).
+    """
+
+    def __init__(self, config, signal_processor, stats=None, metrics_sink=None):
+        self.config = config
+        self.signal_processor = signal_processor
+        self.stats = stats if stats is not None else PipelineStats()
+        self.metrics_sink = metrics_sink  # Destino estruturado opcional das métricas por janela
+        self.sequence = 0
+        self.session_metrics = StreamingMetrics(self.config.n_components)
+        self.gate = ActivityGate(self.config, self.stats) if self.config.activity_gating else None
+        pool_size = max(self.config.result_pool_size, self.config.max_batch_windows)
+        self._mixed_pool = BufferPool(pool_size)
+        self._separated_pool = BufferPool(pool_size)
+        self._metrics_workspace = MetricsWorkspace()
+        self._dead_channels = []
+
+    def normalize(self, window):
+        """
+        Copia e normaliza uma janela (média zero, variância unitária por canal).
+
+        :param window: Janela (frames, canais); pode ser uma visão do buffer circular.
+        :return: Janela normalizada (buffer do pool) ou None se a janela estiver em silêncio absoluto
+                 (ou abaixo de min_signal_threshold, com activity_gating).
+        """
+        data, active = self.normalize_windows(window[np.newaxis])
+        return data[0] if active[0] else None
+
+    def normalize_windows(self, windows):
+        """
+        Copia e normaliza um lote de janelas, cada uma com média zero e variância unitária
+        por canal, no lugar sobre buffers float32 do pool.
+
+        A cópia e o pico são operações sobre o lote inteiro; média, desvio e escala são
+        aplicados por (janela, canal), com escalares. Com broadcasting, o ufunc alocaria a
+        cada chamada um buffer de iteração (~32 KiB, mais que uma janela estéreo de 2048
+        frames), e o einsum no lugar copia o lote; o preço são janelas x canais iterações
+        em Python por lote.
+
+        :param windows: Array (janelas, frames, canais); pode ser a visão sobreposta
+                        produzida por framing.frame_windows.
+        :return: (lote normalizado, máscara das janelas ativas). Janelas em silêncio
+                 absoluto ou, com activity_gating, abaixo de min_signal_threshold ficam
+                 fora da máscara e seu conteúdo no lote não deve ser usado.
+        """
+        with self.stats.time_stage("normalize"):
+            data = self._mixed_pool.take(len(windows), windows.shape[1:])
+            np.copyto(data, windows, casting="same_kind")
+            # Pico sem o temporário de np.abs; NaN/inf aparecem no pico e só então são tratados
+            peaks = np.maximum(data.max(axis=(1, 2)), -data.min(axis=(1, 2)))
+            if not np.isfinite(peaks).all():
+                np.nan_to_num(data, copy=False)
+                peaks = np.maximum(data.max(axis=(1, 2)), -data.min(axis=(1, 2)))
+            active = peaks > 0
+            if self.gate is not None:
+                active[active] = ~self.gate.idle(peaks[active])
+            if not active.any():
+                return data, active
+
+            # Um canal sem variância (entrada desligada ou constante) fica em zero em vez de
+            # virar 0/0 = NaN
+            n_frames = data.shape[1]
+            dead_channels = set()
+            for index in np.flatnonzero(active):
+                for number, channel in enumerate(data[index].T):
+                    channel -= channel.mean()
+                    deviation = np.sqrt(np.dot(channel, channel) / n_frames)
+                    if deviation > _MIN_RELATIVE_DEVIATION * peaks[index]:
+                        channel /= deviation
+                    else:
+                        channel.fill(0.0)
+                        dead_channels.add(number)
+            self._report_dead_channels(dead_channels)
+            return data, active
+
+    def _report_dead_channels(self, dead_channels):
+        """Avisa quando o conjunto de canais sem variância muda (não a cada janela)"""
+        if dead_channels:
+            self.stats.increment("dead_channel_windows")
+        dead_channels = sorted(dead_channels)
+        if dead_channels == self._dead_channels:
+            return
+        if dead_channels:
+            logging.warning(f"Canais sem variância (desligados ou constantes), mantidos em zero: {dead_channels}")
+        else:
+            logging.warning("Todos os canais voltaram a ter variância")
+        self._dead_channels = dead_channels
+
+    @staticmethod
+    def compute_metrics(separated_data, workspace=None):
+        """Calcula todas as métricas para todos os pares de sinais separados"""
+        return SignalAnalysis.pairwise_metrics(separated_data, workspace=workspace)
+
+    def process(self, data, capture_time=None):
+        """
+        Aplica o ICA e calcula as métricas sobre uma janela já normalizada.
+
+        :param data: Janela normalizada (frames, canais).
+        :param capture_time: Instante de captura da janela, repassado ao resultado.
+        :return: ProcessingResult ou None se o ICA não retornou dados.
+        """
+        with self.stats.time_stage("ica"):
+            separated_data = self._separate(data)
+        if separated_data is None:
+            logging.warning("Nenhum dado separado foi retornado.")
+            self.stats.increment("ica_failures")
+            return None
+
+        with self.stats.time_stage("metrics"):
+            matrices = self.compute_metrics(separated_data, self._metrics_workspace)
+            metrics = SignalAnalysis.summarize(matrices)
+            self.session_metrics.update(separated_data)
+
+        self.sequence += 1
+        if self.metrics_sink is not None:
+            self.metrics_sink.record(self.sequence, metrics, capture_time)
+        else:
+            logging.debug("Distâncias entre sinais separados: %s", metrics)
+        self.stats.increment("windows_processed")
+        return ProcessingResult(self.sequence, data, separated_data, metrics, matrices, capture_time)
+
+    def _separate(self, data):
+        """ICA completo ou, se a mistura não mudou desde o último ajuste, reaplicação da matriz em cache"""
+        out = self._separated_pool.take(1, (len(data), self.config.n_components))[0]
+        if self.gate is None:
+            return self.signal_processor.process(data, out)
+
+        separated_data = None
+        decision = self.gate.decide(data)
+        if decision == "reapply":
+            separated_data = self.signal_processor.reapply(data, out)
+        if separated_data is None:
+            decision = "refit"
+            separated_data = self.signal_processor.process(data, out)
+            if separated_data is None:
+                return None
+        self.gate.record(decision, data)
+        return separated_data
@@ -1,18 +1,50 @@
 import numpy as np
-from sklearn.decomposition import FastICA
 import logging
+import threading
+from ica_engines import INCREMENTAL_ENGINES, NumpyFastICA, create_engine
+
+
+def limit_blas_threads(threads=1):
+    """Limita as threads do BLAS/OpenMP do processo (quando o paralelismo é entre processos)"""
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(threads)
+    except ImportError:
+        pass
 
 
 class SignalProcessor:
     def __init__(self, config):
-        # Aumente o número de iterações e ajuste a tolerância
+        # Motor escolhido em config.ica_engine; iterações e tolerância vêm da configuração
+        # (ica_max_iter, ica_tol). O branqueamento por eigh da covariância (canais x canais)
+        # já reduz os canais a n_components por PCA antes das iterações.
         self.config = config
-        self.ica = FastICA(n_components=self.config.n_components,
-                           random_state=42,
-                           max_iter=200,  # Aumente o número de iterações
-                           tol=0.01)  # Aumente a tolerância
-        self.all_mixed_data = []
-        self.all_separated_data = []
+        self._ica = None  # Criado no primeiro uso, fora da thread principal (ver prepare)
+        self._engine_lock = threading.Lock()
+
+        # Estado do modo incremental: matriz de separação carregada entre janelas
+        self.unmixing = None  # (n_components, n_canais)
+        self.mean = None
+        self.windows_since_fit = 0
+        self._tanh = None  # Área de trabalho do gradiente natural
+
+    @property
+    def ica(self):
+        """Motor de ICA, criado no primeiro uso"""
+        if self._ica is None:
+            with self._engine_lock:
+                if self._ica is None:
+                    self._ica = create_engine(self.config)
+        return self._ica
+
+    def prepare(self):
+        """
+        Cria o motor de ICA antes da primeira janela.
+
+        A importação do motor (o sklearn leva mais de 1 s) fica na thread que chama este
+        método, e não na thread principal, que monta a interface em paralelo.
+        """
+        return self.ica
 
     def enqueue_audio_data(self, data):
         # Enfileira os frames de áudio capturados
@@ -28,14 +60,105 @@ class SignalProcessor:
                 buffer_data.append(self.audio_buffer.get())
             return np.concatenate(buffer_data, axis=0)
 
-    def process(self, buffer):
-        """Aplica o ICA no buffer e separa os sinais"""
+    def process(self, buffer, out=None):
+        """
+        Aplica o ICA no buffer (amostras, canais) e separa os sinais em n_components.
+
+        :param out: Array (amostras, n_components) float32 opcional que recebe o resultado;
+                    com o motor "numpy" nenhum array do tamanho da janela é alocado.
+        """
         try:
-            separated = self.ica.fit_transform(buffer)
-            self.all_separated_data.append(separated)
-            logging.info(f"Processamento ICA realizado com sucesso.")
+            # Álgebra linear em float32, o formato entregue pelo PortAudio
+            buffer = np.asarray(buffer, dtype=np.float32)
+            # O motor "stft" já reaproveita a solução anterior em cada bin
+            if self.config.ica_mode == "incremental" and self.config.ica_engine in INCREMENTAL_ENGINES:
+                separated = self._process_incremental(buffer, out)
+            else:
+                separated = self._fit_transform(buffer, out)
+            logging.debug("Processamento ICA realizado com sucesso.")
             return separated
         except Exception as e:
             logging.error(f"Erro no processamento do sinal: {e}", exc_info=True)
             return None
 
+    def reapply(self, buffer, out=None):
+        """
+        Separa a janela com a última matriz de separação, sem novo ajuste.
+
+        :return: Array (amostras, n_components) ou None se não houver matriz em cache
+                 (nenhum ajuste ainda ou motor sem matriz única, como o "stft").
+        """
+        if self.unmixing is not None:
+            unmixing, mean = self.unmixing, self.mean
+        elif getattr(self.ica, "components_", None) is not None and self.config.ica_engine in INCREMENTAL_ENGINES:
+            unmixing, mean = self.ica.components_, self.ica.mean_
+        else:
+            return None
+        return self._apply(np.asarray(buffer, dtype=np.float32), unmixing, mean, out)
+
+    @staticmethod
+    def _apply(buffer, unmixing, mean, out=None):
+        """(buffer - mean) @ unmixing.T sem alocar uma cópia centralizada da janela"""
+        separated = np.matmul(buffer, unmixing.T, out=out)
+        bias = mean @ unmixing.T
+        for component in range(separated.shape[1]):  # escalar por componente: sem buffers do ufunc
+            separated[:, component] -= bias[component]
+        return separated
+
+    def _fit_transform(self, buffer, out):
+        if out is None:
+            return self.ica.fit_transform(buffer)
+        if isinstance(self.ica, NumpyFastICA):
+            return self.ica.fit_transform(buffer, out=out)
+        np.copyto(out, self.ica.fit_transform(buffer), casting="same_kind")
+        return out
+
+    def _process_incremental(self, buffer, out=None):
+        """Reaproveita a matriz de separação da janela anterior"""
+        if self.unmixing is None or self.windows_since_fit >= self.config.ica_refit_interval:
+            return self._refit(buffer, out)
+
+        self.windows_since_fit += 1
+        return self._natural_gradient_step(buffer, out)
+
+    def _refit(self, buffer, out=None):
+        """Ajuste completo do FastICA, semeado com a solução anterior quando existir"""
+        if self.unmixing is not None:
+            # Leva a matriz anterior para o espaço branqueado e normaliza as linhas
+            w_init = self.unmixing @ np.linalg.pinv(self.ica.whitening_)
+            w_init /= np.linalg.norm(w_init, axis=1, keepdims=True)
+            self.ica.set_params(w_init=w_init)
+
+        separated = self._fit_transform(buffer, out)
+        self.unmixing = self.ica.components_.astype(np.float32)
+        self.mean = self.ica.mean_.astype(np.float32)
+        self.windows_since_fit = 0
+        return separated
+
+    def _natural_gradient_step(self, buffer, out=None):
+        """Separa a janela com a matriz atual e a atualiza por gradiente natural (Infomax estendido)"""
+        separated = self._apply(buffer, self.unmixing, self.mean, out)
+        n_samples = separated.shape[0]
+        if self._tanh is None or self._tanh.shape != separated.shape:
+            self._tanh = np.empty(separated.shape, dtype=np.float32)
+        tanh = np.tanh(separated, out=self._tanh)
+
+        # Sinal da curtose de cada componente: +1 super-gaussiano, -1 sub-gaussiano
+        # (médias por einsum, sem temporários do tamanho da janela)
+        mean_derivative = 1 - np.einsum('ij,ij->j', tanh, tanh) / n_samples
+        mean_power = np.einsum('ij,ij->j', separated, separated) / n_samples
+        kurtosis_sign = np.sign(mean_derivative * mean_power
+                                - np.einsum('ij,ij->j', tanh, separated) / n_samples)
+        # ΔW = (I - K E[tanh(u) uᵀ] - E[u uᵀ]) W
+        identity = np.eye(self.unmixing.shape[0], dtype=np.float32)
+        gradient = (identity
+                    - kurtosis_sign[:, np.newaxis] * (tanh.T @ separated) / n_samples
+                    - (separated.T @ separated) / n_samples)
+        updated = self.unmixing + self.config.ica_learning_rate * gradient @ self.unmixing
+
+        if np.all(np.isfinite(updated)):
+            self.unmixing = updated
+        else:
+            # Atualização divergiu: força um ajuste completo na próxima janela
+            self.windows_since_fit = self.config.ica_refit_interval
+        return separated
@@ -1,22 +1,28 @@
 import pyqtgraph as pg
 from PyQt5 import QtCore, QtWidgets
 import sys
-import numpy as np
 
 
 class SignalVisualizer:
-    def __init__(self, config):
+    def __init__(self, config, display):
         """
         Inicializa o visualizador de sinais com base na configuração fornecida.
 
         :param config: Objeto de configuração contendo window_size, update_interval e n_components.
+        :param display: DisplayHistory alimentado pelo worker; a interface apenas o redesenha.
         """
         self.config = config
         self.window_size = self.config.window_size  # Acessa o valor de window_size do objeto config
         self.update_interval = self.config.update_interval  # Em milissegundos
 
-        # Criação da interface PyQt
-        self.app = QtWidgets.QApplication(sys.argv)
+        # Históricos rolantes exibidos (decimados para a largura em pixels de cada gráfico)
+        self.history_size = display.history_size
+        self.mixed_buffer = display.mixed
+        self.separated_buffer = display.separated
+        self.metrics_lines = None
+
+        # A QApplication é única por processo: reaproveita a criada por main, se houver
+        self.app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
 
         # Criação da janela principal
         self.main_window = QtWidgets.QWidget()
@@ -32,7 +38,7 @@ class SignalVisualizer:
         # Inicializando gráfico único para o sinal misturado
         self.mixed_plot = self.graph_widget.addPlot(title="Sinal Misturado (Entrada)")
         self.mixed_plot.setYRange(-1, 1)
-        self.mixed_plot.setXRange(0, self.window_size)
+        self.mixed_plot.setXRange(0, self.history_size)
         self.mixed_curve = self.mixed_plot.plot(pen='g')  # Curva única para sinal misturado
         self.graph_widget.nextRow()
 
@@ -43,7 +49,7 @@ class SignalVisualizer:
         for i in range(self.config.n_components):
             plot = self.graph_widget.addPlot(title=f"Sinal Separado {i + 1} (ICA)")
             plot.setYRange(-1, 1)
-            plot.setXRange(0, self.window_size)
+            plot.setXRange(0, self.history_size)
             color = colors[i % len(colors)]
             curve = plot.plot(pen=color)
             self.separated_plots.append(plot)
@@ -58,39 +64,37 @@ class SignalVisualizer:
 
         self.main_window.show()  # Exibe a janela principal
 
-    def update_plot(self, mixed_data: np.ndarray, separated_data: np.ndarray, metrics: dict):
+    def update_plot(self, metrics: dict):
         """
-        Atualiza os gráficos com os dados mais recentes e exibe as métricas calculadas.
+        Redesenha os históricos (já alimentados pelo worker) e exibe as métricas calculadas.
 
-        :param mixed_data: Dados misturados (entrada).
-        :param separated_data: Dados separados pelo ICA.
         :param metrics: Dicionário de métricas calculadas.
         """
-        # Atualizar o gráfico do sinal misturado (uma única curva)
-        if mixed_data is not None:
-            self.mixed_curve.setData(mixed_data[:, 0])
-
-        # Atualizar gráficos separados para cada componente do sinal separado
-        if separated_data is not None:
-            for i, curve in enumerate(self.separated_curves):
-                if i < separated_data.shape[1]:  # Garante que não ultrapasse o número de componentes
-                    curve.setData(separated_data[:, i])
+        # Redesenhar apenas os pontos decimados dos históricos
+        self._draw_curve(self.mixed_plot, self.mixed_curve, self.mixed_buffer, 0)
+        for i, curve in enumerate(self.separated_curves):
+            self._draw_curve(self.separated_plots[i], curve, self.separated_buffer, i)
 
-        # Atualizar a exibição das métricas
+        # Atualizar a exibição das métricas somente quando o texto muda
         if metrics:
-            metrics_text = "Métricas entre sinais separados:\n"
-            for metric_name, value in metrics.items():
-                metrics_text += f"{metric_name}: {value:.10f}\n"  # Aumenta a precisão para 10 casas decimais
-            self.metrics_text.setText(metrics_text)
+            lines = [f"{metric_name}: {value:.10f}" for metric_name, value in metrics.items()]
+            if lines != self.metrics_lines:
+                self.metrics_lines = lines
+                self.metrics_text.setPlainText("Métricas entre sinais separados:\n" + "\n".join(lines))
+
+    @staticmethod
+    def _draw_curve(plot, curve, buffer, channel):
+        """Envia à curva o histórico decimado por mín-máx para a largura atual do gráfico"""
+        width = plot.getViewBox().width() or buffer.max_points
+        x, y = buffer.decimated(channel, width)
+        curve.setData(x, y, skipFiniteCheck=True)
 
     def start_update_loop(self, update_callback):
-        """Inicia o loop de atualização usando QTimer."""
+        """Inicia o loop de atualização usando QTimer (o loop de eventos é executado por quem chama)."""
         self.timer = QtCore.QTimer()
         self.timer.timeout.connect(update_callback)
         self.timer.start(self.update_interval)  # Definido pelo valor de update_interval no config
 
-        self.start()  # Inicia a aplicação
-
     def start(self):
-        """Inicia a aplicação PyQt e gerencia a execução do loop de eventos."""
-        sys.exit(self.app.exec_())
+        """Executa o loop de eventos da aplicação PyQt e retorna o código de saída."""
+        return self.app.exec_()
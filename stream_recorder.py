@@ -0,0 +1,172 @@
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+class ChunkedNpyWriter:
+    """
+    Grava frames em arquivos .npy pré-alocados (memory map), com rotação por tamanho ou tempo.
+
+    Cada bloco é criado já com o tamanho máximo; ao fechar um bloco parcialmente preenchido,
+    o cabeçalho é reescrito com o número real de frames e o arquivo é truncado, o que não
+    exige copiar os dados.
+    """
+
+    def __init__(self, directory, prefix, channels, chunk_frames, rotate_seconds=None, dtype=np.float32):
+        """
+        :param directory: Diretório de destino.
+        :param prefix: Prefixo dos arquivos (prefix_0000.npy, prefix_0001.npy, ...).
+        :param channels: Número de canais por frame.
+        :param chunk_frames: Número máximo de frames por arquivo.
+        :param rotate_seconds: Idade máxima (relógio) de um arquivo aberto, ou None.
+        """
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self.channels = channels
+        self.chunk_frames = chunk_frames
+        self.rotate_seconds = rotate_seconds
+        self.dtype = np.dtype(dtype)
+        self.chunks = []  # [(caminho, frames)] dos blocos já fechados
+        self.total_frames = 0
+        self._array = None
+        self._path = None
+        self._position = 0
+        self._opened_at = 0.0
+
+    def write(self, frames):
+        """Acrescenta frames (n, channels), rotacionando o arquivo quando necessário"""
+        offset = 0
+        while offset < len(frames):
+            if self._array is None:
+                self._open_chunk()
+            count = min(len(frames) - offset, self.chunk_frames - self._position)
+            self._array[self._position:self._position + count] = frames[offset:offset + count]
+            self._position += count
+            self.total_frames += count
+            offset += count
+
+            expired = (self.rotate_seconds is not None
+                       and time.monotonic() - self._opened_at >= self.rotate_seconds)
+            if self._position == self.chunk_frames or expired:
+                self._close_chunk()
+
+    def close(self):
+        """Fecha o bloco atual e retorna a lista de blocos gravados"""
+        if self._array is not None:
+            self._close_chunk()
+        return self.chunks
+
+    def _open_chunk(self):
+        self._path = self.directory / f"{self.prefix}_{len(self.chunks):04d}.npy"
+        self._array = np.lib.format.open_memmap(self._path, mode='w+', dtype=self.dtype,
+                                                shape=(self.chunk_frames, self.channels))
+        self._position = 0
+        self._opened_at = time.monotonic()
+
+    def _close_chunk(self):
+        header_length = self._array.offset
+        self._array.flush()
+        self._array = None
+
+        if self._position < self.chunk_frames:
+            # O NumPy reserva espaço no cabeçalho para alterar o primeiro eixo no lugar
+            header = {'descr': np.lib.format.dtype_to_descr(self.dtype),
+                      'fortran_order': False,
+                      'shape': (self._position, self.channels)}
+            with open(self._path, 'r+b') as f:
+                np.lib.format.write_array_header_1_0(f, header)
+                if f.tell() != header_length:
+                    raise RuntimeError(f"Cabeçalho de {self._path} mudou de tamanho ao truncar")
+                f.truncate(header_length + self._position * self.channels * self.dtype.itemsize)
+
+        self.chunks.append((self._path, self._position))
+        self._path = None
+
+
+class StreamRecorder:
+    """
+    Gravação contínua das janelas misturadas e separadas em blocos .npy no disco.
+
+    A memória usada é constante (apenas os blocos abertos em memory map) e o salvamento ao
+    final só fecha os arquivos e escreve um manifest.json com a lista de blocos.
+    """
+
+    def __init__(self, config, session_name=None):
+        self.config = config
+        session_name = session_name or time.strftime("ica_recording_%Y%m%d_%H%M%S")
+        self.directory = Path(self.config.recording_dir) / session_name
+        self.chunk_frames = int(self.config.recording_chunk_seconds * self.config.sample_rate)
+        self.hop_size = self.config.hop_size or self.config.window_size
+        self._writers = {}
+        self._lock = threading.Lock()
+        self.closed = False
+
+    @property
+    def has_data(self):
+        return any(writer.total_frames for writer in self._writers.values())
+
+    def record(self, result):
+        """
+        Grava as janelas de um ProcessingResult.
+
+        Com janelas sobrepostas (hop_size < window_size), após a primeira janela só os
+        últimos hop_size frames são novos e apenas eles são gravados.
+        """
+        with self._lock:
+            if self.closed:
+                return
+            new_frames = slice(None) if not self.has_data else slice(-self.hop_size, None)
+            self._write("mixed", result.mixed[new_frames])
+            self._write("separated", result.separated[new_frames])
+
+    def close(self):
+        """Fecha os blocos abertos e grava o manifesto da sessão"""
+        with self._lock:
+            if self.closed:
+                return None
+            self.closed = True
+            if not self._writers:
+                return None
+
+            manifest = {
+                "sample_rate": self.config.sample_rate,
+                "streams": {
+                    name: {
+                        "channels": writer.channels,
+                        "frames": writer.total_frames,
+                        "chunks": [{"file": path.name, "frames": frames} for path, frames in writer.close()],
+                    }
+                    for name, writer in self._writers.items()
+                },
+            }
+            manifest_path = self.directory / "manifest.json"
+            with open(manifest_path, 'w') as f:
+                json.dump(manifest, f, indent=2)
+            logging.info(f"Gravação finalizada em {self.directory}")
+            return manifest_path
+
+    def _write(self, name, frames):
+        writer = self._writers.get(name)
+        if writer is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            writer = ChunkedNpyWriter(self.directory, name, frames.shape[1], self.chunk_frames,
+                                      self.config.recording_rotate_interval)
+            self._writers[name] = writer
+        writer.write(frames)
+
+
+def load_recording(directory, stream="separated", mmap_mode='r'):
+    """
+    Abre os blocos de uma gravação como arrays em memory map, sem carregá-los na memória.
+
+    :return: Lista de arrays (frames, canais), na ordem de gravação.
+    """
+    directory = Path(directory)
+    with open(directory / "manifest.json") as f:
+        manifest = json.load(f)
+    return [np.load(directory / chunk["file"], mmap_mode=mmap_mode)
+            for chunk in manifest["streams"][stream]["chunks"]]
@@ -0,0 +1,304 @@
+"""
+Separação simultânea de várias capturas independentes no mesmo host.
+
+Cada fluxo tem um processo próprio com seu SignalProcessor, o que evita a disputa pelo GIL
+entre fluxos. Como em batch_separate, o ActivityGate fica desligado por padrão (--gating o
+liga) e as estatísticas de cada fluxo informam quantas janelas saíram zeradas. Janelas de áudio e resultados trafegam por SharedRingBuffers em memória
+compartilhada (sem serializar arrays), e cada processo publica suas estatísticas em uma
+linha de um array também compartilhado.
+
+Uso (reprodução de gravações como fluxos independentes):
+    python stream_server.py gravacao1.wav gravacao2.wav gravacao3.npy -o separados
+"""
+import argparse
+import logging
+import multiprocessing
+import time
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+
+from audio_config import AudioConfig
+from ica_engines import ENGINES
+from ring_buffer import SharedRingBuffer
+
+# Colunas do array de estatísticas por fluxo
+STAT_FIELDS = ("ready", "windows_processed", "zeroed_windows", "busy_seconds",
+               "latency_sum_ms", "latency_max_ms")
+
+
+def _stream_worker(stream_id, config, input_descriptor, output_descriptor, stats_name, n_streams, stop_event):
+    """Laço de um processo de fluxo: janela de entrada → SignalPipeline → anel de saída"""
+    from multiprocessing import shared_memory
+    from signal_pipeline import SignalPipeline
+    from signal_processor import SignalProcessor, limit_blas_threads
+
+    logging.basicConfig(level=logging.WARNING,
+                        format='%(asctime)s - %(levelname)s - [%(processName)s] %(message)s')
+    limit_blas_threads(1)
+
+    input_ring = SharedRingBuffer.attach(input_descriptor)
+    output_ring = SharedRingBuffer.attach(output_descriptor)
+    stats_shm = shared_memory.SharedMemory(name=stats_name)
+    stats = np.ndarray((n_streams, len(STAT_FIELDS)), dtype=np.float64, buffer=stats_shm.buf)[stream_id]
+    field = {name: index for index, name in enumerate(STAT_FIELDS)}
+
+    pipeline = SignalPipeline(config, SignalProcessor(config))
+    poll_interval = config.window_size / config.sample_rate / 4
+    silence = np.zeros((config.window_size, config.n_components), dtype=np.float32)
+    stats[field["ready"]] = 1
+
+    try:
+        while not stop_event.is_set():
+            if input_ring.available() < config.window_size:
+                time.sleep(poll_interval)
+                continue
+            window = input_ring.peek(config.window_size)
+
+            start_time = time.perf_counter()
+            capture_time = input_ring.timestamp(config.window_size - 1)
+            data = pipeline.normalize(window)
+            input_ring.advance(config.window_size)
+            result = pipeline.process(data, capture_time) if data is not None else None
+
+            # Janelas em silêncio (ou com falha do ICA) mantêm o alinhamento da saída
+            separated = result.separated if result is not None else silence
+            output_ring.write(separated, capture_time)
+
+            finished = time.perf_counter()
+            latency_ms = (finished - capture_time) * 1000
+            stats[field["windows_processed" if result is not None else "zeroed_windows"]] += 1
+            stats[field["busy_seconds"]] += finished - start_time
+            stats[field["latency_sum_ms"]] += latency_ms
+            stats[field["latency_max_ms"]] = max(stats[field["latency_max_ms"]], latency_ms)
+    finally:
+        del stats
+        input_ring.close()
+        output_ring.close()
+        stats_shm.close()
+
+
+class StreamSupervisor:
+    """
+    Supervisor de N fluxos, um processo de separação por fluxo.
+
+    push() e read_results() devem ser chamados por uma única thread por fluxo (cada anel é
+    de um produtor e um consumidor).
+    """
+
+    def __init__(self, config, n_streams, buffer_seconds=5.0, gating=False):
+        """
+        :param config: Configuração comum a todos os fluxos (channels, window_size, ...).
+        :param n_streams: Número de fluxos independentes.
+        :param buffer_seconds: Capacidade de cada anel de entrada e de saída, em segundos.
+        :param gating: Usa o ActivityGate nos fluxos (config.activity_gating é ignorado).
+        """
+        from multiprocessing import shared_memory
+
+        config = replace(config, activity_gating=gating)
+        self.config = config
+        self.n_streams = n_streams
+        capacity = max(2 * config.window_size, int(buffer_seconds * config.sample_rate))
+        self.input_rings = [SharedRingBuffer(capacity, config.channels) for _ in range(n_streams)]
+        self.output_rings = [SharedRingBuffer(capacity, config.n_components) for _ in range(n_streams)]
+        self._stats_shm = shared_memory.SharedMemory(create=True, size=n_streams * len(STAT_FIELDS) * 8)
+        self._stats = np.ndarray((n_streams, len(STAT_FIELDS)), dtype=np.float64, buffer=self._stats_shm.buf)
+        self._stats[:] = 0
+
+        # spawn: os processos não herdam threads (logging, Qt) nem o estado do BLAS do pai
+        self._context = multiprocessing.get_context("spawn")
+        self._stop_event = self._context.Event()
+        self._processes = []
+        self.started_at = None
+
+    def start(self, timeout=60.0):
+        """Inicia os processos e aguarda todos ficarem prontos"""
+        for stream_id in range(self.n_streams):
+            process = self._context.Process(
+                target=_stream_worker, name=f"StreamWorker-{stream_id}", daemon=True,
+                args=(stream_id, self.config, self.input_rings[stream_id].descriptor(),
+                      self.output_rings[stream_id].descriptor(), self._stats_shm.name,
+                      self.n_streams, self._stop_event))
+            process.start()
+            self._processes.append(process)
+
+        deadline = time.monotonic() + timeout
+        while not np.all(self._stats[:, STAT_FIELDS.index("ready")]):
+            if time.monotonic() > deadline or not all(p.is_alive() for p in self._processes):
+                self.stop()
+                raise RuntimeError("Processos de separação não ficaram prontos")
+            time.sleep(0.01)
+        self.started_at = time.perf_counter()
+        logging.info(f"{self.n_streams} fluxos de separação prontos")
+
+    def push(self, stream_id, block, timestamp=None):
+        """Entrega um bloco (frames, channels) ao fluxo; False se o anel estiver cheio"""
+        return self.input_rings[stream_id].write(block, timestamp)
+
+    def free(self, stream_id):
+        """Frames que ainda cabem no anel de entrada do fluxo"""
+        return self.input_rings[stream_id].free()
+
+    def read_results(self, stream_id, max_frames=None):
+        """
+        Retira os frames separados disponíveis do fluxo.
+
+        :return: Cópia (frames, n_components), possivelmente vazia.
+        """
+        ring = self.output_rings[stream_id]
+        n_frames = ring.available() if max_frames is None else min(max_frames, ring.available())
+        if n_frames == 0:
+            return np.empty((0, self.config.n_components), dtype=np.float32)
+        results = ring.peek(n_frames).copy()
+        ring.advance(n_frames)
+        return results
+
+    def pending(self, stream_id):
+        """Frames de entrada ainda não processados (janelas completas)"""
+        available = self.input_rings[stream_id].available()
+        return available - available % self.config.window_size
+
+    def stats(self):
+        """Estatísticas por fluxo"""
+        uptime = time.perf_counter() - self.started_at if self.started_at else 0.0
+        streams = []
+        for stream_id, row in enumerate(self._stats):
+            values = dict(zip(STAT_FIELDS, row.tolist()))
+            windows = values["windows_processed"] + values["zeroed_windows"]
+            audio_seconds = windows * self.config.window_size / self.config.sample_rate
+            streams.append({
+                "stream": stream_id,
+                "windows_processed": int(values["windows_processed"]),
+                "zeroed_windows": int(values["zeroed_windows"]),
+                "busy_seconds": values["busy_seconds"],
+                "utilization": values["busy_seconds"] / uptime if uptime else 0.0,
+                "realtime_factor": audio_seconds / values["busy_seconds"] if values["busy_seconds"] else 0.0,
+                "latency_mean_ms": values["latency_sum_ms"] / windows if windows else 0.0,
+                "latency_max_ms": values["latency_max_ms"],
+                "input": self.input_rings[stream_id].stats(),
+                "output": self.output_rings[stream_id].stats(),
+            })
+        return streams
+
+    def stop(self, timeout=5.0):
+        """Encerra os processos e libera a memória compartilhada"""
+        self._stop_event.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        for ring in self.input_rings + self.output_rings:
+            ring.close()
+        self.input_rings = self.output_rings = []
+        self._stats = None
+        self._stats_shm.close()
+        self._stats_shm.unlink()
+
+
+def replay_files(paths, output_dir, config, buffer_seconds=5.0, gating=False):
+    """
+    Reproduz cada gravação como um fluxo independente, o mais rápido que os processos
+    aceitarem, e grava as faixas separadas em .npy.
+
+    :return: (estatísticas por fluxo, totais agregados)
+    """
+    from batch_separate import SeparatedWriter, open_recording
+
+    readers = [open_recording(path, config.sample_rate) for path in paths]
+    channels = {reader.channels for reader in readers}
+    if len(channels) != 1:
+        raise ValueError(f"Todas as gravações devem ter o mesmo número de canais: {sorted(channels)}")
+    config = replace(config, channels=channels.pop(), sample_rate=readers[0].sample_rate)
+
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    writers = [SeparatedWriter(Path(output_dir) / f"{Path(path).stem}_separated",
+                               reader.n_frames // config.window_size * config.window_size,
+                               config.n_components, config.sample_rate, 'npy')
+               for path, reader in zip(paths, readers)]
+
+    supervisor = StreamSupervisor(config, len(paths), buffer_seconds, gating)
+    supervisor.start()
+    try:
+        start_time = time.perf_counter()
+        expected = [reader.n_frames // config.window_size * config.window_size for reader in readers]
+        remaining = list(expected)
+        collected = [0] * len(readers)
+        pending_block = [None] * len(readers)
+        deadline = None
+        while collected != expected:
+            for stream_id, reader in enumerate(readers):
+                if pending_block[stream_id] is None and remaining[stream_id]:
+                    pending_block[stream_id] = reader.read(min(config.buffer_size, remaining[stream_id]))
+                    remaining[stream_id] -= len(pending_block[stream_id])
+                block = pending_block[stream_id]
+                if block is not None and supervisor.free(stream_id) >= len(block):
+                    supervisor.push(stream_id, block)
+                    pending_block[stream_id] = None
+
+                results = supervisor.read_results(stream_id)
+                writers[stream_id].write(results)
+                collected[stream_id] += len(results)
+
+            # Toda a entrada foi entregue: aguarda as últimas janelas por um tempo limitado
+            if not any(remaining) and all(block is None for block in pending_block):
+                deadline = deadline or time.monotonic() + 5.0
+                if time.monotonic() > deadline:
+                    logging.warning(f"Janelas não recebidas por fluxo: "
+                                    f"{[e - c for e, c in zip(expected, collected)]}")
+                    break
+            time.sleep(0.0005)
+        elapsed = time.perf_counter() - start_time
+        streams = supervisor.stats()
+    finally:
+        supervisor.stop()
+        for writer in writers:
+            writer.close()
+        for reader in readers:
+            reader.close()
+
+    audio_seconds = sum(reader.n_frames for reader in readers) / config.sample_rate
+    totals = {"streams": len(paths), "elapsed": elapsed,
+              "zeroed_windows": sum(stream["zeroed_windows"] for stream in streams),
+              "realtime_factor": audio_seconds / elapsed if elapsed > 0 else float('inf')}
+    return streams, totals
+
+
+def parse_args(argv=None):
+    defaults = AudioConfig()
+    parser = argparse.ArgumentParser(description="Separação ICA de vários fluxos em paralelo")
+    parser.add_argument('inputs', nargs='+', help="Uma gravação WAV/NPY por fluxo")
+    parser.add_argument('-o', '--output-dir', default='separated')
+    parser.add_argument('--sample-rate', type=int, default=defaults.sample_rate,
+                        help="Taxa de amostragem assumida para arquivos .npy")
+    parser.add_argument('--window-size', type=int, default=defaults.window_size)
+    parser.add_argument('--n-components', type=int, default=defaults.n_components)
+    parser.add_argument('--ica-mode', choices=['batch', 'incremental'], default=defaults.ica_mode)
+    parser.add_argument('--ica-engine', choices=sorted(ENGINES), default=defaults.ica_engine)
+    parser.add_argument('--buffer-seconds', type=float, default=5.0)
+    parser.add_argument('--gating', action='store_true',
+                        help="Zera janelas abaixo de min_signal_threshold e reaplica matrizes em cache")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - [%(processName)s] %(message)s')
+    config = AudioConfig(window_size=args.window_size, sample_rate=args.sample_rate,
+                         n_components=args.n_components, ica_mode=args.ica_mode, ica_engine=args.ica_engine)
+    streams, totals = replay_files(args.inputs, args.output_dir, config, args.buffer_seconds, args.gating)
+    for stream in streams:
+        logging.info(f"Fluxo {stream['stream']}: {stream['windows_processed']} janelas, "
+                     f"{stream['zeroed_windows']} zeradas, "
+                     f"utilização {stream['utilization']:.0%}, "
+                     f"latência média {stream['latency_mean_ms']:.1f} ms, "
+                     f"perdas entrada/saída {stream['input']['overruns']}/{stream['output']['overruns']}")
+    logging.info(f"{totals['streams']} fluxos em {totals['elapsed']:.1f} s: "
+                 f"{totals['zeroed_windows']} janelas zeradas, "
+                 f"fator de tempo real agregado {totals['realtime_factor']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,60 @@
+import numpy as np
+
+from activity_gate import ActivityGate
+from audio_config import AudioConfig
+from pipeline_stats import PipelineStats
+
+
+def _window(mixing, seed, n_samples=4096):
+    sources = np.random.default_rng(seed).laplace(size=(n_samples, mixing.shape[1]))
+    data = sources @ mixing.T
+    return ((data - data.mean(axis=0)) / data.std(axis=0)).astype(np.float32)
+
+
+def test_idle_windows_are_skipped():
+    config = AudioConfig(min_signal_threshold=0.01)
+    stats = PipelineStats()
+    gate = ActivityGate(config, stats)
+
+    idle = gate.idle(np.array([0.0, 0.005, 0.01, 0.5]))
+    np.testing.assert_array_equal(idle, [True, True, False, False])
+    assert gate.counts["skip"] == 2 and stats.counters["gate_skip"] == 2
+
+
+def test_reapply_while_mixture_is_unchanged_and_refit_when_it_changes():
+    config = AudioConfig(n_components=2, gate_drift_threshold=0.1, gate_max_reapply=50)
+    gate = ActivityGate(config)
+    mixing = np.array([[1.0, 0.6], [0.4, 1.0]])
+
+    first = _window(mixing, seed=0)
+    assert gate.decide(first) == "refit"  # sem referência ainda
+    gate.record("refit", first)
+
+    same = _window(mixing, seed=1)
+    assert gate.decide(same) == "reapply"
+    assert gate.drift < config.gate_drift_threshold
+    gate.record("reapply", same)
+
+    changed = _window(np.array([[1.0, -0.9], [0.9, 0.2]]), seed=2)
+    assert gate.decide(changed) == "refit"
+    assert gate.drift >= config.gate_drift_threshold
+    gate.record("refit", changed)
+    assert gate.decide(_window(np.array([[1.0, -0.9], [0.9, 0.2]]), seed=3)) == "reapply"
+
+    assert gate.counts == {"refit": 2, "reapply": 1, "skip": 0}
+    assert gate.shares()["refit"] == 2 / 3
+
+
+def test_refit_is_forced_after_max_reapply():
+    config = AudioConfig(n_components=2, gate_max_reapply=3)
+    gate = ActivityGate(config)
+    mixing = np.array([[1.0, 0.6], [0.4, 1.0]])
+    gate.record("refit", _window(mixing, seed=0))
+
+    decisions = []
+    for seed in range(1, 6):
+        window = _window(mixing, seed)
+        decision = gate.decide(window)
+        gate.record(decision, window)
+        decisions.append(decision)
+    assert decisions == ["reapply", "reapply", "reapply", "refit", "reapply"]
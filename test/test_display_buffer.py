@@ -0,0 +1,22 @@
+import numpy as np
+
+from audio_config import AudioConfig
+from display_buffer import DisplayHistory
+from framing import frame_windows
+from signal_pipeline import ProcessingResult
+
+
+def test_history_from_overlapping_windows_is_continuous():
+    config = AudioConfig(window_size=1024, hop_size=256, sample_rate=8000, display_history_seconds=0.5,
+                         n_components=2)
+    signal = np.arange(8000, dtype=np.float32)[:, np.newaxis] * np.ones((1, 2), dtype=np.float32)
+    display = DisplayHistory(config)
+
+    windows = frame_windows(signal, config.window_size, config.hop_size)
+    for sequence, window in enumerate(windows, 1):
+        display.record(ProcessingResult(sequence, window, window, {}, {}))
+
+    consumed = config.window_size + (len(windows) - 1) * config.hop_size
+    expected = signal[consumed - display.history_size:consumed, 0]
+    np.testing.assert_array_equal(display.mixed.view(0), expected)
+    np.testing.assert_array_equal(display.separated.view(1), expected)
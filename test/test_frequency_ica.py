@@ -0,0 +1,28 @@
+import numpy as np
+
+from audio_config import AudioConfig
+from benchmark import bench_fft_scaling, convolutive_mixture, separation_quality
+from ica_engines import create_engine
+
+
+def test_default_stft_engine_separates_convolutive_mixture():
+    config = AudioConfig(ica_engine="stft")
+    engine = create_engine(config)
+    n_windows, window_size, filter_length = 20, config.window_size, 16
+    sources, _, mixtures = convolutive_mixture(2, n_windows * window_size, 2, filter_length, config.sample_rate)
+
+    sir = []
+    for index in range(n_windows):
+        window = slice(index * window_size, (index + 1) * window_size)
+        separated = engine.fit_transform(mixtures[window])
+        assert separated.shape == (window_size, 2)
+        sir.append(separation_quality(separated, sources[window], filter_length)[1])
+    assert np.mean(sir) > 15.0
+
+
+def test_fft_scaling_fails_on_quality_of_default_only():
+    config = AudioConfig(metrics_log_path="")
+    results, failures = bench_fft_scaling(config, [256], n_windows=3, min_sir_db=100.0)
+    assert [result["engine"] for result in results] == ["fastica", "stft/128", "stft/256"]
+    assert [result["default"] for result in results] == [False, True, False]
+    assert len(failures) == 1 and "stft/128" in failures[0]
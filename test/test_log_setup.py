@@ -0,0 +1,25 @@
+import logging
+
+from log_setup import RateLimitFilter
+
+
+def _record(level, created, lineno=10):
+    record = logging.makeLogRecord({'levelno': level, 'levelname': logging.getLevelName(level),
+                                    'pathname': 'signal_pipeline.py', 'lineno': lineno, 'msg': 'janela'})
+    record.created = created
+    return record
+
+
+def test_rate_limit_only_drops_routine_levels():
+    rate_limit = RateLimitFilter(interval=5.0)
+
+    assert [rate_limit.filter(_record(logging.INFO, t)) for t in (0.0, 1.0, 2.0)] == [True, False, False]
+    assert all(rate_limit.filter(_record(logging.WARNING, t, lineno=20)) for t in (0.0, 1.0, 2.0))
+    assert all(rate_limit.filter(_record(logging.ERROR, t, lineno=30)) for t in (0.0, 1.0, 2.0))
+
+    # A próxima mensagem após o intervalo leva a contagem; o total por ponto de log é mantido
+    record = _record(logging.INFO, 6.0)
+    assert rate_limit.filter(record) and record.suppressed == 2
+    rate_limit.filter(_record(logging.INFO, 7.0))
+    assert rate_limit.suppressed == {('signal_pipeline.py', 10): 3}
+    assert rate_limit.pending() == {('signal_pipeline.py', 10): 1}
@@ -0,0 +1,49 @@
+import time
+
+import numpy as np
+
+from audio_config import AudioConfig
+from benchmark import synthetic_mixture
+from processing_worker import ProcessingWorker, PublishedResult
+from ring_buffer import RingBuffer
+from signal_pipeline import SignalPipeline
+from signal_processor import SignalProcessor
+
+
+def test_gui_receives_only_small_fields_without_pool_buffers():
+    config = AudioConfig(metrics_log_path="", ica_engine="numpy", result_pool_size=4)
+    results = []
+    worker = ProcessingWorker(config, RingBuffer(4 * config.window_size, config.channels),
+                              SignalPipeline(config, SignalProcessor(config)), on_result=results.append)
+    _, _, mixtures = synthetic_mixture(config.n_components, config.window_size * 6, config.channels, seed=0)
+
+    for window in mixtures.reshape(6, config.window_size, config.channels):
+        worker._process_window(worker.pipeline.normalize(window), 123.0)
+
+    latest = worker.latest_result()
+    assert isinstance(latest, PublishedResult)
+    assert not any(isinstance(value, np.ndarray) for value in vars(latest).values())
+    assert (latest.sequence, latest.capture_time) == (6, 123.0)
+    # As métricas publicadas são as da última janela, entregue completa ao on_result
+    assert latest.metrics is results[-1].metrics
+    assert results[-1].separated.shape == (config.window_size, config.n_components)
+
+
+def test_hop_size_follows_window_size_by_default():
+    for window_size in (1024, 4096):
+        config = AudioConfig(metrics_log_path="", window_size=window_size)
+        worker = ProcessingWorker(config, RingBuffer(4 * window_size, config.channels),
+                                  SignalPipeline(config, SignalProcessor(config)))
+        assert worker.framer.hop_size == window_size
+
+
+def test_idle_polls_are_not_underruns():
+    config = AudioConfig(metrics_log_path="", ica_engine="numpy")
+    ring = RingBuffer(4 * config.window_size, config.channels)
+    worker = ProcessingWorker(config, ring, SignalPipeline(config, SignalProcessor(config)))
+    ring.write(np.zeros((config.window_size // 2, config.channels), dtype=np.float32))
+
+    worker.start()
+    time.sleep(20 * worker.poll_interval)
+    worker.stop(timeout=5.0)
+    assert ring.underruns == 0 and worker.processed_count == 0
@@ -0,0 +1,79 @@
+import multiprocessing
+
+import numpy as np
+
+from ring_buffer import RingBuffer, SharedRingBuffer
+
+
+def _blocks(n_blocks, frames, channels):
+    return np.arange(n_blocks * frames * channels, dtype=np.float32).reshape(n_blocks, frames, channels)
+
+
+def test_reads_across_the_wrap_are_contiguous_views():
+    ring = RingBuffer(10, 2)
+    blocks = _blocks(5, 4, 2)
+
+    for index, block in enumerate(blocks):
+        assert ring.write(block, timestamp=float(index))
+        view = ring.peek(4)
+        # A escrita de frames 8..11 passa do fim do armazenamento; o espelho mantém a visão contígua
+        assert np.shares_memory(view, ring._data)
+        np.testing.assert_array_equal(view, block)
+        assert ring.timestamp(0) == index and ring.timestamp(3) == index
+        ring.advance(4)
+
+    assert ring.available() == 0 and ring.overruns == 0 and ring.underruns == 0
+
+
+def test_overruns_and_underruns_are_counted_without_corrupting_data():
+    ring = RingBuffer(10, 2)
+    blocks = _blocks(4, 4, 2)
+
+    assert ring.write(blocks[0]) and ring.write(blocks[1])
+    assert not ring.write(blocks[2])  # 8 + 4 > 10: bloco inteiro descartado
+    assert ring.overruns == 1 and ring.available() == 8
+
+    assert ring.peek(9) is None
+    assert ring.underruns == 1
+
+    ring.advance(4)
+    assert ring.write(blocks[3])
+    np.testing.assert_array_equal(ring.peek(8), np.concatenate([blocks[1], blocks[3]]))
+    assert ring.stats() == {"available": 8, "capacity": 10, "overruns": 1, "underruns": 1}
+
+
+def _produce(descriptor, blocks):
+    ring = SharedRingBuffer.attach(descriptor)
+    try:
+        ring.write(np.zeros((ring.capacity + 1, ring.channels), dtype=np.float32))  # nunca cabe
+        for index, block in enumerate(blocks):
+            while not ring.write(block, timestamp=float(index)):
+                pass
+    finally:
+        ring.close()
+
+
+def test_shared_ring_buffer_across_processes():
+    ring = SharedRingBuffer(16, 2)
+    blocks = _blocks(20, 4, 2)
+    try:
+        producer = multiprocessing.get_context("spawn").Process(target=_produce,
+                                                                 args=(ring.descriptor(), blocks))
+        producer.start()
+        received = []
+        while len(received) < len(blocks):
+            view = ring.peek(4)
+            if view is None:
+                continue
+            assert ring.timestamp(0) == len(received)
+            received.append(view.copy())
+            ring.advance(4)
+        producer.join(timeout=10)
+
+        assert producer.exitcode == 0
+        np.testing.assert_array_equal(np.stack(received), blocks)
+        # Contadores e índices do produtor são vistos pelo consumidor (o bloco grande demais
+        # e as tentativas com o buffer cheio contam como overruns)
+        assert ring.overruns >= 1 and ring.available() == 0
+    finally:
+        ring.close()
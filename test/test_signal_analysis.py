@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from signal_analysis import METRIC_NAMES, MetricsWorkspace, SignalAnalysis
+
+LEGACY = {
+    "Euclidean": SignalAnalysis.euclidean_distance,
+    "Cross Correlation": SignalAnalysis.cross_correlation,
+    "Pearson": SignalAnalysis.pearson_distance,
+    "MSE": SignalAnalysis.mean_squared_error,
+    "Cosine": SignalAnalysis.cosine_distance,
+    "Cross Entropy": SignalAnalysis.cross_entropy,
+}
+
+
+@pytest.mark.parametrize("n_components", [2, 3])
+def test_fused_metrics_match_legacy_pairwise_functions(n_components):
+    rng = np.random.default_rng(0)
+    signals = rng.laplace(size=(2048, n_components)).astype(np.float32)
+    signals[:, -1] += 0.5 * signals[:, 0]  # pares correlacionados e não correlacionados
+
+    matrices = SignalAnalysis.pairwise_metrics(signals)
+    assert set(matrices) == set(METRIC_NAMES)
+    for name, function in LEGACY.items():
+        for i in range(n_components):
+            for j in range(n_components):
+                if i == j:
+                    continue
+                expected = function(signals[:, i].astype(np.float64), signals[:, j].astype(np.float64))
+                assert matrices[name][i, j] == pytest.approx(expected, rel=1e-4, abs=1e-5), (name, i, j)
+
+
+def test_workspace_reuse_across_window_shapes():
+    rng = np.random.default_rng(1)
+    workspace = MetricsWorkspace()
+    for n_samples, n_components in [(1024, 2), (1024, 2), (512, 3)]:
+        signals = rng.standard_normal((n_samples, n_components)).astype(np.float32)
+        reused = SignalAnalysis.pairwise_metrics(signals, workspace=workspace)
+        fresh = SignalAnalysis.pairwise_metrics(signals)
+        for name in METRIC_NAMES:
+            np.testing.assert_array_equal(reused[name], fresh[name])
+
+
+def test_summarize_names_pairs():
+    matrices = SignalAnalysis.pairwise_metrics(np.random.default_rng(2).standard_normal((256, 3)))
+    summary = SignalAnalysis.summarize(matrices)
+    assert len(summary) == 3 * len(METRIC_NAMES)
+    assert summary["MSE 1-3"] == matrices["MSE"][0, 2]
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from audio_config import AudioConfig
+from benchmark import synthetic_mixture
+from signal_pipeline import SignalPipeline
+from signal_processor import SignalProcessor
+
+
+def _pipeline(**overrides):
+    config = AudioConfig(metrics_log_path="", **overrides)
+    return SignalPipeline(config, SignalProcessor(config))
+
+
+@pytest.mark.parametrize("engine", ["fastica", "numpy"])
+def test_dead_channel_does_not_disable_separation(engine, caplog):
+    _, _, mixtures = synthetic_mixture(2, 2048, 4, seed=0)
+    mixtures[:, 2] = 0.0  # entrada desligada
+    pipeline = _pipeline(ica_engine=engine, channels=4, n_components=2)
+
+    data = pipeline.normalize(mixtures)
+    assert np.isfinite(data).all()
+    assert not data[:, 2].any()
+    np.testing.assert_allclose(data[:, [0, 1, 3]].std(axis=0), 1.0, rtol=1e-4)
+
+    result = pipeline.process(data)
+    assert result is not None and np.isfinite(result.separated).all()
+    assert pipeline.stats.counters["dead_channel_windows"] == 1
+    assert "[2]" in caplog.text
+
+
+def test_constant_channel_is_left_at_zero():
+    _, _, mixtures = synthetic_mixture(2, 2048, 3, seed=1)
+    mixtures[:, 1] = 0.25  # offset DC sem sinal
+    data = _pipeline(channels=3).normalize(mixtures)
+    assert np.isfinite(data).all() and not data[:, 1].any()
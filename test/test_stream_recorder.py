@@ -0,0 +1,34 @@
+import numpy as np
+
+from stream_recorder import ChunkedNpyWriter
+
+
+def test_chunks_rotate_by_size_and_partial_chunk_is_truncated(tmp_path):
+    frames = np.arange(2 * 25, dtype=np.float32).reshape(25, 2)
+    writer = ChunkedNpyWriter(tmp_path, "mixed", channels=2, chunk_frames=10)
+    writer.write(frames[:7])
+    writer.write(frames[7:])  # atravessa dois limites de bloco
+    chunks = writer.close()
+
+    assert [(path.name, count) for path, count in chunks] == [
+        ("mixed_0000.npy", 10), ("mixed_0001.npy", 10), ("mixed_0002.npy", 5)]
+    assert writer.total_frames == 25
+
+    # O último bloco teve o cabeçalho reescrito para 5 frames e o arquivo truncado
+    partial = chunks[-1][0]
+    assert partial.stat().st_size == chunks[0][0].stat().st_size - 5 * 2 * 4
+    loaded = [np.load(path) for path, _ in chunks]
+    assert loaded[-1].shape == (5, 2)
+    np.testing.assert_array_equal(np.concatenate(loaded), frames)
+
+
+def test_chunks_rotate_by_time(tmp_path):
+    writer = ChunkedNpyWriter(tmp_path, "separated", channels=1, chunk_frames=100, rotate_seconds=0.0)
+    blocks = [np.full((3, 1), value, dtype=np.float32) for value in range(3)]
+    for block in blocks:
+        writer.write(block)
+    chunks = writer.close()
+
+    assert [count for _, count in chunks] == [3, 3, 3]
+    for (path, _), block in zip(chunks, blocks):
+        np.testing.assert_array_equal(np.load(path), block)
@@ -0,0 +1,20 @@
+import numpy as np
+
+
+def whitening_matrix(covariance, n_components):
+    """
+    Branqueamento por PCA a partir da covariância, real ou complexa.
+
+    Projeta nos n_components autovetores de maior autovalor (em ordem decrescente) e escala
+    cada um por 1/sqrt(autovalor), de modo que K C K^H = I.
+
+    :param covariance: Array hermitiano (..., canais, canais); uma pilha (ex.: um bin da
+                       STFT por linha) é decomposta de uma vez.
+    :param n_components: Número de componentes mantidos (<= canais).
+    :return: Array (..., n_components, canais).
+    """
+    eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+    # eigh ordena de forma crescente: os n_components maiores estão no fim
+    eigenvalues = np.maximum(eigenvalues[..., :-n_components - 1:-1], 1e-12)
+    eigenvectors = eigenvectors[..., :-n_components - 1:-1]
+    return (eigenvectors / np.sqrt(eigenvalues)[..., np.newaxis, :]).conj().swapaxes(-1, -2)